@@ -0,0 +1,494 @@
+###########################################################################################
+# Name: Mercedes VanArsdale 
+# Description: Caches for the images and sounds used by the Room Adventure GUI, so that
+# assets are read and decoded from disk once instead of on every command, a background
+# worker so that loading them never blocks the Tkinter mainloop, and a packed archive of
+# every asset so that they're read from one memory-mapped file instead of dozens.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+from tkinter import PhotoImage, TclError
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import io
+import marshal
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import traceback
+
+###########################################################################################
+# constants
+IMAGE_CACHE_SIZE = 32  # the most decoded images kept in memory at once
+SOUND_CHANNELS = 8  # the mixer channels reserved for sound effects
+WORKER_THREADS = 2  # the threads that load assets in the background
+WORKER_POLL_MS = 10  # how often (in ms) the GUI picks up finished background work
+# the sound effects used by the game (decoded once when the sound bank loads)
+SOUNDS = ["click.mp3", "item.mp3", "error.mp3", "cat_meow.mp3", "crow.mp3", "walkway_note.mp3",
+          "weeping_door.mp3", "mage_note.mp3", "treasure.mp3", "good_ending.mp3", "bad_ending.mp3"]
+MUSIC = "background.mp3"  # the background music (streamed, never decoded up front)
+HERE = os.path.dirname(os.path.abspath(__file__))
+ASSET_FOLDER = os.path.join(HERE, "NEW ADVENTURE GAME 3")  # where the images and sounds are kept
+ARCHIVE = os.path.join(HERE, "assets.pak")  # every asset packed into one file
+ASSET_EXTENSIONS = (".png", ".gif", ".jpg", ".jpeg", ".mp3", ".ogg", ".wav")  # the files that are packed
+ARCHIVE_MAGIC = b"ARPK"  # the first bytes of an asset archive
+ARCHIVE_VERSION = 2  # the version of the archive format
+ARCHIVE_HEADER = struct.Struct("<4sHIQ")  # magic, version, number of assets, offset of the index
+
+
+###########################################################################################
+# the blueprint for an asset archive
+# the file is memory-mapped and each asset is handed out as a slice of the mapping (a
+# memoryview), so nothing is read or copied until someone uses the bytes
+class AssetArchive:
+    # the constructor
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, indexOffset = ARCHIVE_HEADER.unpack_from(self._data, 0)
+        if (magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION):
+            raise ValueError("{} is not an asset archive (version {})".format(path, ARCHIVE_VERSION))
+        # the index has the position and length of every asset (by file name)
+        self._index = marshal.loads(self._data[indexOffset:])
+        self._view = memoryview(self._data)
+
+    # returns the bytes of the asset as a memoryview (or None if there's no such asset)
+    def get(self, name):
+        entry = self._index.get(name)
+        if (entry == None):
+            return None
+        offset, length = entry
+        return self._view[offset:offset + length]
+
+    # the names of every asset in the archive
+    def __iter__(self):
+        return iter(self._index)
+
+
+###########################################################################################
+# the blueprint for an asset folder
+# reads assets straight from the folder (used when there's no archive)
+class AssetFolder:
+    # the constructor
+    def __init__(self, path):
+        self.path = path
+
+    # returns the bytes of the asset (or None if it can't be read)
+    def get(self, name):
+        try:
+            with open(os.path.join(self.path, name), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    # the names of every asset in the folder
+    def __iter__(self):
+        return iter(sorted(name for name in os.listdir(self.path) if (name.lower().endswith(ASSET_EXTENSIONS))))
+
+
+# packs every asset in the folder into one archive
+# the assets are written one after another, followed by an index of where each one is
+def packAssets(folder=ASSET_FOLDER, target=ARCHIVE):
+    index = {}
+    # every process packs into a file of its own, so two games starting at once can't
+    # write over each other's half-packed archive
+    temporary = "{}.{}.tmp".format(target, os.getpid())
+    with open(temporary, "wb") as f:
+        # the header is written again once the position of the index is known
+        f.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, 0, 0))
+        for name in AssetFolder(folder):
+            with open(os.path.join(folder, name), "rb") as asset:
+                data = asset.read()
+            index[name] = (f.tell(), len(data))
+            f.write(data)
+        indexOffset = f.tell()
+        f.write(marshal.dumps(index))
+        f.seek(0)
+        f.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, len(index), indexOffset))
+    # only replace the old archive once the new one is complete
+    os.replace(temporary, target)
+
+
+# opens the game's assets
+# the folder is packed into the archive the first time (and again whenever a file is added
+# to or removed from it; run python assets.py after changing a file in place), and the
+# archive is opened instead, so starting up is one open instead of one per asset
+def openAssets(folder=ASSET_FOLDER, archive=ARCHIVE):
+    try:
+        if (os.path.isdir(folder) and
+                (not os.path.exists(archive) or os.path.getmtime(archive) < os.path.getmtime(folder))):
+            packAssets(folder, archive)
+        try:
+            return AssetArchive(archive)
+        except ValueError:
+            # packed by an older version of the game, so pack it again
+            packAssets(folder, archive)
+            return AssetArchive(archive)
+    except OSError:
+        # e.g., the folder is read only, so just read the files
+        return AssetFolder(folder)
+
+
+# the assets of the game (opened the first time one is needed) and the lock that makes
+# sure only one thread opens (and maybe packs) them
+store = None
+storeLock = threading.Lock()
+
+
+# returns the assets of the game, opening them if needed
+# (the worker threads can ask for the first asset at the same time)
+def assetStore():
+    global store
+    if (store == None):
+        with storeLock:
+            if (store == None):
+                store = openAssets()
+    return store
+
+
+# returns the raw bytes of an asset (e.g., room1.png) (runs on a worker thread)
+# returns None if there's no such asset
+# the archive hands out memoryviews without copying, but Tk (PhotoImage(data=...)) and
+# pygame (a file object) both need real bytes, so this is where the one copy is made
+def readAsset(name):
+    data = assetStore().get(name)
+    if (data == None):
+        return None
+    return bytes(data)
+
+
+# returns the asset as a file object for pygame (or None if there's no such asset)
+def openAsset(name):
+    data = readAsset(name)
+    if (data == None):
+        return None
+    return io.BytesIO(data)
+
+
+# imports and starts the pygame mixer the first time a sound is needed
+# only the mixer is started (not every pygame subsystem), and pygame isn't even imported
+# until then, so it stays off the startup path
+def mixer():
+    import pygame.mixer
+    if (not pygame.mixer.get_init()):
+        pygame.mixer.init()
+    return pygame.mixer
+
+
+# decodes a sound effect (runs on a worker thread)
+# returns None if the sound can't be decoded
+def decodeSound(name):
+    import pygame
+    data = openAsset(name)
+    if (data == None):
+        return None
+    try:
+        return pygame.mixer.Sound(file=data)
+    except (pygame.error, OSError):
+        return None
+
+
+###########################################################################################
+# the blueprint for a background asset worker
+# runs loading work on a small thread pool and hands the results back to the Tkinter
+# thread (Tkinter may only be used from the thread running the mainloop)
+class AssetWorker:
+    # the constructor
+    # the widget is any Tkinter widget (used to schedule the callbacks with after())
+    def __init__(self, widget, threads=WORKER_THREADS, interval=WORKER_POLL_MS):
+        # the worker has a thread pool, a queue of finished jobs, and counters for the
+        # number of jobs in flight (the queue depth), the deepest the queue has been and
+        # the jobs that failed
+        self.widget = widget
+        self.interval = interval
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="assets")
+        self._done = queue.Queue()
+        self._polling = False
+        self.depth = 0
+        self.peak = 0
+        self.failed = 0
+
+    # runs fn(*args) on a worker thread
+    # the callback (if any) is called with the result on the Tkinter thread
+    def submit(self, fn, *args, callback=None):
+        self.depth += 1
+        self.peak = max(self.peak, self.depth)
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda f: self._done.put((f, callback)))
+        # start picking up results if we aren't already
+        if (not self._polling):
+            self._polling = True
+            self.widget.after(self.interval, self._poll)
+
+    # hands every finished job to its callback (runs on the Tkinter thread)
+    def _poll(self):
+        while True:
+            try:
+                future, callback = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self.depth -= 1
+            # a job that failed (e.g., a missing file) is counted and otherwise skipped
+            if (future.exception() != None):
+                self.failed += 1
+            elif (callback != None):
+                # a callback that fails is counted (and reported) like a failed job, so the
+                # results after it are still handed out
+                try:
+                    callback(future.result())
+                except Exception:
+                    self.failed += 1
+                    traceback.print_exc()
+
+        # keep polling only while there is work in flight
+        if (self.depth > 0):
+            self.widget.after(self.interval, self._poll)
+        else:
+            self._polling = False
+
+    # stops the worker threads (work that hasn't started yet is dropped)
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+###########################################################################################
+# the blueprint for an image cache
+# keeps decoded PhotoImages keyed by their file path and drops the least recently used
+# image once the cache is full
+class ImageCache:
+    # the constructor
+    # the worker (optional) is an AssetWorker used to read images in the background
+    def __init__(self, size=IMAGE_CACHE_SIZE, worker=None):
+        # the cache has a maximum size, the decoded images (oldest first), the paths that
+        # are waiting to be preloaded and the callbacks waiting on background loads
+        self.size = size
+        self.worker = worker
+        self._images = OrderedDict()
+        self._pending = []
+        self._waiting = {}
+        # the scaled copies to read instead of the originals (by asset name, see scaling.py)
+        self.scaled = {}
+        self.hits = 0
+        self.misses = 0
+
+    # returns the bytes of the image: its scaled copy if it has one, otherwise the original
+    # (runs on a worker thread, too)
+    def read(self, path):
+        scaled = self.scaled.get(path)
+        if (scaled != None):
+            try:
+                with open(scaled, "rb") as f:
+                    return f.read()
+            except OSError:
+                pass
+        return readAsset(path)
+
+    # starts using scaled copies of images (by asset name)
+    # the originals of those images are dropped, so the copies are shown from now on
+    def useScaled(self, scaled):
+        self.scaled.update(scaled)
+        for path in scaled:
+            self._images.pop(path, None)
+
+    # returns the decoded image for the path, decoding it if it isn't cached yet
+    def get(self, path):
+        image = self._images.get(path)
+        if (image != None):
+            # mark the image as the most recently used
+            self._images.move_to_end(path)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        data = self.read(path)
+        if (data == None):
+            raise TclError("couldn't read {}".format(path))
+        return self._store(path, PhotoImage(data=data))
+
+    # adds a decoded image to the cache
+    def _store(self, path, image):
+        self._images[path] = image
+        # drop the least recently used image if the cache is too big
+        # (widgets showing it keep their own reference, so nothing on screen disappears)
+        if (len(self._images) > self.size):
+            self._images.popitem(last=False)
+        return image
+
+    # calls the callback with the decoded image for the path
+    # a cached image is handed over right away; otherwise the file is read on the worker
+    # and the callback is called once the image is ready
+    def request(self, path, callback=None):
+        if (path in self._images or self.worker == None):
+            image = self.get(path)
+            if (callback != None):
+                callback(image)
+            return
+
+        self.misses += 1
+        # only read the file once, however many callers are waiting on it
+        if (path in self._waiting):
+            self._waiting[path].append(callback)
+            return
+        self._waiting[path] = [callback]
+        self.worker.submit(self.read, path, callback=partial(self._loaded, path))
+
+    # builds the image from bytes read by the worker and hands it to everyone waiting
+    # (Tk images can only be created on the Tkinter thread)
+    def _loaded(self, path, data):
+        callbacks = self._waiting.pop(path, [])
+        if (data == None):
+            return
+        try:
+            image = self._store(path, PhotoImage(data=data))
+        except TclError:
+            return
+        for callback in callbacks:
+            if (callback != None):
+                callback(image)
+
+    # decodes the given images in the background
+    # the widget is any Tkinter widget (used to schedule the work when there's no worker)
+    def preload(self, widget, paths):
+        # with a worker, simply request every image that isn't cached or on its way
+        if (self.worker != None):
+            for path in paths:
+                if (path != None and path not in self._images and path not in self._waiting):
+                    self.request(path)
+                    # a preload doesn't count as a miss
+                    self.misses -= 1
+            return
+
+        # otherwise, only queue the images that aren't cached or already queued
+        start = (len(self._pending) == 0)
+        for path in paths:
+            if (path != None and path not in self._images and path not in self._pending):
+                self._pending.append(path)
+        if (start and len(self._pending)):
+            widget.after_idle(self._preloadNext, widget)
+
+    # decodes one queued image, then lets the GUI handle events before the next one
+    def _preloadNext(self, widget):
+        if (len(self._pending)):
+            path = self._pending.pop(0)
+            if (path not in self._images):
+                # a preload doesn't count as a hit or a miss
+                # and an image that can't be decoded is simply skipped
+                try:
+                    self.get(path)
+                    self.misses -= 1
+                except TclError:
+                    self.misses -= 1
+            if (len(self._pending)):
+                widget.after_idle(self._preloadNext, widget)
+
+    # the number of images currently cached
+    def __len__(self):
+        return len(self._images)
+
+
+###########################################################################################
+# the blueprint for a sound bank
+# keeps every sound effect decoded in memory and plays each one on its own mixer channel,
+# so effects start instantly and never cut off each other or the background music
+class SoundBank:
+    # the constructor
+    # the worker (optional) is an AssetWorker used to decode sounds in the background
+    def __init__(self, names=SOUNDS, channels=SOUND_CHANNELS, worker=None):
+        # the sound bank has the names of its effects, the decoded sounds, the channel
+        # each sound plays on and the sounds being decoded in the background (with the
+        # number of times each should be played once it's ready)
+        self.names = list(names)
+        self.worker = worker
+        self._sounds = {}
+        self._channels = {}
+        self._loading = {}
+        self._count = channels
+        self._mixer = None
+        # the music is streamed from this file object, so it's kept for as long as it plays
+        self._music = None
+
+    # starts the mixer the first time the bank needs it
+    def _start(self):
+        if (self._mixer == None):
+            self._mixer = mixer()
+            self._mixer.set_num_channels(self._count)
+            # keep the effect channels away from sounds played by anything else
+            self._mixer.set_reserved(self._count)
+        return self._mixer
+
+    # decodes all of the effects up front (e.g., at startup)
+    # with a worker, this returns right away and the sounds decode in the background
+    def load(self):
+        self._start()
+        for name in self.names:
+            if (self.worker != None):
+                self._decode(name, 0)
+            else:
+                self.get(name)
+
+    # returns the decoded sound, decoding it on first use
+    def get(self, name):
+        sound = self._sounds.get(name)
+        if (sound == None):
+            sound = self._store(name, self._start().Sound(file=openAsset(name)))
+        return sound
+
+    # adds a decoded sound to the bank
+    def _store(self, name, sound):
+        self._sounds[name] = sound
+        # every sound gets a dedicated channel (shared round robin if there are more
+        # sounds than channels)
+        self._channels[name] = self._start().Channel(len(self._channels) % self._count)
+        return sound
+
+    # decodes a sound on the worker and plays it (plays times) once it's ready
+    def _decode(self, name, plays):
+        if (name in self._loading):
+            self._loading[name] += plays
+            return
+        self._loading[name] = plays
+        self._start()
+        self.worker.submit(decodeSound, name, callback=partial(self._decoded, name))
+
+    # stores a sound decoded by the worker and plays it if anyone asked to in the meantime
+    def _decoded(self, name, sound):
+        plays = self._loading.pop(name, 0)
+        if (sound == None):
+            return
+        if (name not in self._sounds):
+            self._store(name, sound)
+        if (plays > 0):
+            self._channels[name].play(self._sounds[name])
+
+    # plays a sound effect without waiting for it to finish
+    # a sound that isn't decoded yet plays as soon as the worker has decoded it
+    def play(self, name):
+        if (name not in self._sounds and self.worker != None):
+            self._decode(name, 1)
+            return
+        sound = self.get(name)
+        self._channels[name].play(sound)
+
+    # streams the background music on the music channel, looping forever
+    def playMusic(self, name=MUSIC, volume=0.5):
+        music = self._start().music
+        self._music = openAsset(name)
+        music.load(self._music, name)
+        music.set_volume(volume)
+        music.play(-1)
+
+
+###########################################################################################
+# pack the assets from the command line:
+#  python assets.py [<asset folder>] [<archive>]
+if __name__ == "__main__":
+    folder = sys.argv[1] if (len(sys.argv) > 1) else ASSET_FOLDER
+    target = sys.argv[2] if (len(sys.argv) > 2) else ARCHIVE
+    packAssets(folder, target)
+    print("packed {} into {}".format(folder, target))
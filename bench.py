@@ -0,0 +1,317 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: Benchmarks for the Room Adventure game (the command loop, tab completion, the
+# GUI's rendering, room formatting and startup) on synthetic worlds of different sizes.
+# The results are written as JSON so that runs can be compared to catch regressions.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from engine import GameEngine, WordIndex
+from world import WORLD, openWorld
+
+###########################################################################################
+# constants
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIZES = [10, 1000, 100000]  # the number of rooms in each synthetic world
+COMMANDS = 20000  # how many commands are timed per verb
+COMPLETIONS = 20000  # how many tab completions are timed per world
+RENDERS = 500  # how many times the GUI's status and image are set per world
+REPEATS = 3  # each benchmark is run this many times and the best time is kept
+THRESHOLD = 0.2  # how much slower (as a fraction) a benchmark can get before it's a regression
+# the prefixes completed in every world (from a single match to no match at all)
+PREFIXES = ["g", "ta", "item", "item1", "item12", "item123", "coi", "zz"]
+
+
+###########################################################################################
+# synthetic worlds
+
+# builds the source (as in world.json) of a world with the given number of rooms
+# the rooms form a loop (north goes to the next room, south to the previous one), every room
+# has a table and an item of its own to look at and a coin to take, every tenth room is
+# locked with the coin, and every room has someone who wants the coin
+def syntheticWorld(size):
+    with open(WORLD, encoding="utf-8") as f:
+        images = sorted({data["image"] for data in json.load(f)["rooms"]})
+
+    rooms = []
+    triggers = []
+    for i in range(size):
+        id = "s{}".format(i)
+        rooms.append({"id": id, "name": "room{}".format(i), "image": images[i % len(images)],
+                      "description": "You are in room {} of a very large house.".format(i),
+                      "locked": (i % 10 == 5), "key": "coin" if (i % 10 == 5) else None,
+                      "exits": {"north": "s{}".format((i + 1) % size), "south": "s{}".format((i - 1) % size)},
+                      "items": {"table": "It is made of wood.", "item{}".format(i): "It is item number {}.".format(i)},
+                      "grabbables": ["coin"]})
+        triggers.append({"room": id, "verb": "give", "noun": "coin", "response": "Thank you!", "requires": "coin"})
+    return {"start": "s0", "rooms": rooms, "triggers": triggers}
+
+
+# writes a synthetic world to the folder and returns its path
+def writeWorld(folder, size):
+    path = os.path.join(folder, "world{}.json".format(size))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(syntheticWorld(size), f)
+    return path
+
+
+###########################################################################################
+# timing
+
+# runs fn (which does ops operations) REPEATS times and returns the result for the fastest run
+def measure(name, rooms, ops, fn, repeats=REPEATS):
+    best = None
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+        if (best == None or seconds < best):
+            best = seconds
+    return {"name": name, "rooms": rooms, "ops": ops, "seconds": best,
+            "perSecond": ops / best if (best > 0) else None}
+
+
+# returns a result for a benchmark that couldn't run (e.g., there's no display for Tk)
+def skipped(name, rooms, reason):
+    return {"name": name, "rooms": rooms, "skipped": reason}
+
+
+###########################################################################################
+# the benchmarks
+
+# how fast each verb runs through the engine
+def benchCommands(world, size):
+    engine = GameEngine(world)
+    results = []
+
+    # walks north around the loop (through the locked rooms, since the player has the coin)
+    def go():
+        session = engine.newSession()
+        session.inventory["coin"] = True
+        for i in range(COMMANDS):
+            engine.runCommand(session, "go north")
+
+    # looks at the table and the room's own item
+    def look():
+        session = engine.newSession()
+        for i in range(COMMANDS // 2):
+            engine.runCommand(session, "look table")
+            engine.runCommand(session, "look item0")
+
+    # takes the coin (and drops it again, so that every take succeeds)
+    def take():
+        session = engine.newSession()
+        for i in range(COMMANDS):
+            engine.runCommand(session, "take coin")
+            session.inventory.clear()
+
+    # gives the coin to whoever is in the room
+    def give():
+        session = engine.newSession()
+        session.inventory["coin"] = True
+        for i in range(COMMANDS):
+            engine.runCommand(session, "give coin")
+
+    for verb, fn in [("go", go), ("look", look), ("take", take), ("give", give)]:
+        results.append(measure("commands." + verb, size, COMMANDS, fn))
+    return results
+
+
+# how long tab completion takes as the word list grows
+# (every item in the world is a word, as if the player had seen every room)
+def benchCompletion(world, size):
+    words = WordIndex(GameEngine(world).verbs)
+    for room in world:
+        for item in room.items:
+            words.add(item)
+        for item in room.grabbables:
+            words.add(item)
+
+    def complete():
+        for i in range(COMPLETIONS // len(PREFIXES)):
+            for prefix in PREFIXES:
+                words.complete(prefix)
+
+    result = measure("complete", size, COMPLETIONS, complete)
+    result["words"] = len(words)
+    return [result]
+
+
+# how long it takes to format rooms as text
+def benchRoomText(world, size):
+    rooms = [world.room(id) for id in world.ids[:COMMANDS]]
+    start = rooms[0]
+
+    # the same room over and over (its description stays decoded)
+    def same():
+        for i in range(COMMANDS):
+            str(start)
+
+    # every room in turn (their descriptions have to be decoded)
+    def every():
+        for i in range(COMMANDS):
+            str(rooms[i % len(rooms)])
+
+    return [measure("room.str.same", size, COMMANDS, same), measure("room.str.every", size, COMMANDS, every)]
+
+
+# how long the GUI takes to set the status and the room image and to complete the input
+# (skipped if Tk can't open a window, e.g., there's no display)
+def benchGUI(world, size):
+    names = ["gui.setStatus", "gui.setRoomImage", "gui.complete"]
+    try:
+        from tkinter import Tk, TclError, END
+    except ImportError as e:
+        return [skipped(name, size, str(e)) for name in names]
+    try:
+        window = Tk()
+    except TclError as e:
+        return [skipped(name, size, str(e)) for name in names]
+
+    try:
+        import basic
+        game = basic.Game(window)
+        game.play()
+        window.update()
+        # play in the synthetic world from now on
+        engine = GameEngine(world)
+        basic.Game.engine = engine
+        basic.Game.session = engine.newSession()
+        basic.Game.words = engine.newWords(basic.Game.session)
+        rooms = [world.room(id) for id in world.ids[:RENDERS]]
+
+        # as if the player walked from room to room (so every region is redrawn)
+        def setStatus():
+            for i in range(RENDERS):
+                basic.Game.session.currentRoom = rooms[i % len(rooms)]
+                game.setStatus("You continue through the walkway.")
+            window.update()
+
+        def setRoomImage():
+            for i in range(RENDERS):
+                basic.Game.session.currentRoom = rooms[i % len(rooms)]
+                game.setRoomImage()
+                # let the image load and draw (as the mainloop would between commands)
+                window.update()
+
+        def complete():
+            for i in range(RENDERS):
+                basic.Game.player_input.delete(0, END)
+                basic.Game.player_input.insert(END, "look ta")
+                game.complete(None)
+
+        results = [measure("gui.setStatus", size, RENDERS, setStatus),
+                   measure("gui.setRoomImage", size, RENDERS, setRoomImage),
+                   measure("gui.complete", size, RENDERS, complete)]
+        basic.Game.worker.shutdown()
+        return results
+    finally:
+        window.destroy()
+
+
+# how long the game takes to show its first frame (measured by basic.py itself)
+def benchStartup(path, size):
+    try:
+        process = subprocess.run([sys.executable, os.path.join(HERE, "basic.py"), "--timing", "--world", path],
+                                 capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return [skipped("startup", size, str(e))]
+    if (process.returncode != 0):
+        lines = process.stderr.strip().splitlines()
+        return [skipped("startup", size, lines[-1] if (len(lines)) else "exit code {}".format(process.returncode))]
+
+    # e.g., first frame: 120.5 ms
+    result = {"name": "startup", "rooms": size}
+    for line in process.stdout.splitlines():
+        match = re.match(r"(.+): ([\d.]+) ms$", line)
+        if (match):
+            result[match.group(1)] = float(match.group(2)) / 1000
+    return [result]
+
+
+# runs every benchmark on a synthetic world of each size
+def run(sizes, gui=True):
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            path = writeWorld(folder, size)
+            # the first open compiles the world
+            start = time.perf_counter()
+            world = openWorld(path)
+            results.append({"name": "world.open", "rooms": size, "ops": 1, "seconds": time.perf_counter() - start})
+
+            results += benchCommands(world, size)
+            results += benchCompletion(world, size)
+            results += benchRoomText(world, size)
+            if (gui):
+                results += benchGUI(world, size)
+                results += benchStartup(path, size)
+            world.close()
+    return results
+
+
+###########################################################################################
+# comparing runs
+
+# compares the results with an earlier run
+# returns the benchmarks that got more than threshold slower (as text)
+def compare(results, earlier, threshold=THRESHOLD):
+    before = {}
+    for result in earlier["results"]:
+        if ("seconds" in result):
+            before[(result["name"], result["rooms"])] = result["seconds"]
+
+    regressions = []
+    for result in results:
+        old = before.get((result["name"], result["rooms"]))
+        if (old == None or "seconds" not in result or old <= 0):
+            continue
+        change = result["seconds"] / old - 1
+        if (change > threshold):
+            regressions.append("{} ({} rooms): {:.1%} slower".format(result["name"], result["rooms"], change))
+    return regressions
+
+
+###########################################################################################
+# run the benchmarks from the command line:
+#  python bench.py [--sizes 10 1000 100000] [--no-gui] [--output <file>] [--compare <earlier run>]
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Room Adventure game.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="the number of rooms in each world")
+    parser.add_argument("--no-gui", action="store_true", help="skip the GUI and startup benchmarks")
+    parser.add_argument("--output", help="write the results to this file (instead of printing them)")
+    parser.add_argument("--compare", help="an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(args)
+
+    report = {"python": platform.python_version(), "platform": platform.platform(), "time": time.time(),
+              "results": run(args.sizes, not args.no_gui)}
+    text = json.dumps(report, indent=1)
+    if (args.output != None):
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if (args.compare != None):
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report["results"], json.load(f), args.threshold)
+        for regression in regressions:
+            print("regression: " + regression, file=sys.stderr)
+        if (len(regressions)):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: Checks that a world can be won. Every state a player can get into (their
+# room, what they carry and the rooms they've unlocked) is explored, and the checker
+# reports the rooms nobody can reach, the dead ends and the shortest way to win.
+# Every set of keys a player can hold is a state of its own, so a world with many keys that
+# can be picked up in any order (e.g., a big generated one) soon has too many states to
+# check: a generated world of 600 rooms (12 keys) already has over a million.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from world import WORLD, createRooms
+
+###########################################################################################
+# constants
+GOAL_EXIT = "back_home"  # the rooms behind exits with this name win the game (as do good endings)
+CHUNK = 4096  # the most states handed to a worker at once
+PARALLEL = 20000  # levels with fewer states than this are explored without the workers
+
+
+###########################################################################################
+# the blueprint for the rules of a world
+# everything that changes a player's state (exits, locks, grabbables and the triggers that
+# give or take items) read out of a world into plain tuples, so that it can be searched
+# quickly (and rebuilt in every worker process)
+class Rules:
+    # the constructor
+    def __init__(self, world, goal=GOAL_EXIT):
+        # the rules have, by room id, the name, exits (with the id behind each one), the key
+        # needed to get in, the grabbables and the triggers that swap items
+        # the winning rooms are the good endings and the ones behind an exit named goal
+        self.start = world.start.id
+        self.names = {}
+        self.exits = {}
+        self.locks = {}
+        self.grabbables = {}
+        self.swaps = {}
+        self.goals = set()
+        for room in world:
+            self.names[room.id] = room.name.strip()
+            self.exits[room.id] = []
+            if (room.ending == "good"):
+                self.goals.add(room.id)
+            for exit in room.exits:
+                target = room.exitTo(exit)
+                if (target != None):
+                    self.exits[room.id].append((exit, target.id))
+                    if (exit == goal):
+                        self.goals.add(target.id)
+            if (room.is_locked and room.key_required):
+                self.locks[room.id] = room.key_required
+            self.grabbables[room.id] = room.grabbables
+
+        # only triggers that give or take items change the player's state
+        # (a look trigger only fires for an item that's in the room)
+        taken = set()
+        for (id, verb, noun), trigger in world.triggers.items():
+            if (len(trigger.gives) == 0 and len(trigger.takes) == 0):
+                continue
+            if (verb == "look" and world.room(id).describe(noun) == None):
+                continue
+            command = "{} {}".format(verb, noun if (noun != None) else "anything")
+            self.swaps.setdefault(id, []).append((command, trigger.requires, tuple(trigger.gives),
+                                                  tuple(trigger.takes)))
+            taken.update(trigger.takes)
+        # a room only needs to be remembered as unlocked if its key can be taken away again
+        self.consumable = taken
+
+        # only the items that open a room matter, and the items a trigger needs to give or
+        # take one of those (and so on); the rest (e.g., souvenirs, or a coin traded for a gem
+        # that opens nothing) are left out of the states, so they don't multiply them
+        needed = set(self.locks.values())
+        grown = True
+        while (grown):
+            grown = False
+            for swaps in self.swaps.values():
+                for command, requires, gives, takes in swaps:
+                    if (requires != None and requires not in needed and
+                            any(item in needed for item in gives + takes)):
+                        needed.add(requires)
+                        grown = True
+        for id, items in self.grabbables.items():
+            self.grabbables[id] = [item for item in items if (item in needed)]
+        # (and a trigger that only swaps items that don't matter changes nothing)
+        for id, swaps in self.swaps.items():
+            self.swaps[id] = [(command, requires, tuple(item for item in gives if (item in needed)),
+                               tuple(item for item in takes if (item in needed)))
+                              for command, requires, gives, takes in swaps
+                              if (any(item in needed for item in gives + takes))]
+
+    # returns every (command, next state) from the state
+    # a state is the room id, the items carried and the rooms unlocked with keys that have
+    # since been taken away (both frozensets)
+    def moves(self, state):
+        room, items, unlocked = state
+        moves = []
+        for exit, target in self.exits[room]:
+            key = self.locks.get(target)
+            if (key == None or target in unlocked):
+                moves.append(("go " + exit, (target, items, unlocked)))
+            elif (key in items):
+                # the room stays open even if the key is taken away later
+                opened = (unlocked | {target}) if (key in self.consumable) else unlocked
+                moves.append(("go " + exit, (target, items, opened)))
+        for item in self.grabbables[room]:
+            if (item not in items):
+                moves.append(("take " + item, (room, items | {item}, unlocked)))
+        for command, requires, gives, takes in self.swaps.get(room, []):
+            if (requires == None or requires in items):
+                after = (items - set(takes)) | set(gives)
+                if (after != items):
+                    moves.append((command, (room, frozenset(after), unlocked)))
+        return moves
+
+
+###########################################################################################
+# the worker processes
+
+# the rules of the world the worker process is checking
+rules = None
+
+
+# reads the world in a worker process
+def startWorker(path, goal):
+    global rules
+    rules = Rules(createRooms(path), goal)
+
+
+# returns the moves from every state in the chunk (runs in a worker process)
+def expand(states):
+    return [(state, rules.moves(state)) for state in states]
+
+
+###########################################################################################
+# the blueprint for a check
+# explores every state breadth first (so the first win found is the shortest one),
+# optionally spreading each level of the search over a pool of processes
+class Check:
+    # the constructor
+    def __init__(self, rules):
+        # the check has the rules, the way each state was first reached (the state before it
+        # and the command), the states that lead to each state (only the reverse edges are
+        # kept, since that's all winnable needs), and the winning states
+        self.rules = rules
+        self.previous = {}
+        self.before = {}
+        self.wins = []
+
+    # explores every state reachable from the start
+    # the pool (optional) is a ProcessPoolExecutor whose workers have the same rules
+    def run(self, pool=None):
+        start = (self.rules.start, frozenset(), frozenset())
+        self.previous = {start: None}
+        level = [start]
+        while (len(level)):
+            # big levels are split between the workers, small ones aren't worth sending
+            if (pool != None and len(level) >= PARALLEL):
+                chunks = [level[i:i + CHUNK] for i in range(0, len(level), CHUNK)]
+                expanded = [pair for chunk in pool.map(expand, chunks) for pair in chunk]
+            else:
+                expanded = [(state, self.rules.moves(state)) for state in level]
+
+            level = []
+            for state, moves in expanded:
+                # the game is over once the player has won
+                if (state[0] in self.rules.goals):
+                    self.wins.append(state)
+                    moves = []
+                for command, after in moves:
+                    self.before.setdefault(after, []).append(state)
+                    if (after not in self.previous):
+                        self.previous[after] = (state, command)
+                        level.append(after)
+        return self
+
+    # the commands that lead to the state (from the start)
+    def path(self, state):
+        commands = []
+        while (self.previous[state] != None):
+            state, command = self.previous[state]
+            commands.append(command)
+        commands.reverse()
+        return commands
+
+    # the shortest way to win (or None if the world can't be won)
+    def shortestWin(self):
+        if (len(self.wins) == 0):
+            return None
+        # wins are found in order of distance, so the first is the shortest
+        return self.path(self.wins[0])
+
+    # the rooms that can never be reached
+    def unreachable(self):
+        reached = {state[0] for state in self.previous}
+        return [id for id in self.rules.exits if (id not in reached)]
+
+    # the states from which the game can still be won
+    def winnable(self):
+        before = self.before
+        winnable = set(self.wins)
+        queue = list(self.wins)
+        while (len(queue)):
+            state = queue.pop()
+            for earlier in before.get(state, []):
+                if (earlier not in winnable):
+                    winnable.add(earlier)
+                    queue.append(earlier)
+        return winnable
+
+    # the rooms (that aren't winning rooms) where the game can't be won anymore, however the
+    # player got there (e.g., the room behind the red_door)
+    # and the number of states (in any room) that can't be won from
+    def deadEnds(self):
+        winnable = self.winnable()
+        rooms = {}
+        stuck = 0
+        for state in self.previous:
+            alive = (state in winnable)
+            rooms[state[0]] = rooms.get(state[0], False) or alive
+            if (not alive):
+                stuck += 1
+        return [id for id, alive in rooms.items() if (not alive and id not in self.rules.goals)], stuck
+
+
+# checks the world (a world file) and returns the finished check
+# with workers > 1, big levels of the search are spread over that many processes
+def check(path=WORLD, goal=GOAL_EXIT, workers=1):
+    rules = Rules(createRooms(path), goal)
+    if (workers <= 1):
+        return Check(rules).run()
+    with ProcessPoolExecutor(max_workers=workers, initializer=startWorker, initargs=(path, goal)) as pool:
+        return Check(rules).run(pool)
+
+
+###########################################################################################
+# check a world from the command line:
+#  python checker.py [<world file>] [--goal <exit>] [--workers <processes>]
+# exits with 1 if the world can't be won
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Check that a Room Adventure world can be won.")
+    parser.add_argument("world", nargs="?", default=WORLD)
+    parser.add_argument("--goal", default=GOAL_EXIT, help="the exit that wins the game")
+    parser.add_argument("--workers", type=int, default=1, help="spread big searches over this many processes")
+    args = parser.parse_args(args)
+
+    result = check(args.world, args.goal, args.workers)
+    names = result.rules.names
+    print("states explored: {}".format(len(result.previous)))
+
+    unreachable = result.unreachable()
+    print("unreachable rooms: {}".format(", ".join("{} ({})".format(id, names[id]) for id in unreachable) or "none"))
+    deadEnds, stuck = result.deadEnds()
+    print("dead ends: {}".format(", ".join("{} ({})".format(id, names[id]) for id in deadEnds) or "none"))
+    print("states the game can't be won from: {}".format(stuck))
+
+    win = result.shortestWin()
+    if (win == None):
+        print("the world can't be won")
+        sys.exit(1)
+    print("shortest win ({} commands): {}".format(len(win), ", ".join(win)))
+
+
+if __name__ == "__main__":
+    main()
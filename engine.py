@@ -0,0 +1,555 @@
+###########################################################################################
+# Name: Mercedes VanArsdale 
+# Description: The headless game logic of the Room Adventure game. Nothing in here needs a
+# window or an audio device, so commands can be run straight from tests, tools and servers.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+from bisect import bisect_left, insort
+from os.path import commonprefix
+import os
+import struct
+from routes import RouteFinder
+from world import reloadWorld
+
+###########################################################################################
+# constants
+VERBS = ["go", "look", "take", "give"]  # the supported vocabulary verbs
+QUIT_COMMANDS = ["exit", "quit", "bye"]  # the supported quit commands
+SAVES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves")  # where save and load keep their files
+SAVE_EXTENSION = ".sav"  # the extension of saved games
+SAVE_MAGIC = b"ARSV"  # the first bytes of a saved session
+SAVES_MAGIC = b"ARSB"  # the first bytes of a batch of saved sessions
+SAVE_VERSION = 2  # the version of the save format
+# magic, version, the signature of the world (to catch saves from another world, or from
+# before the world was edited), the player's room, the length of the inventory bitmask and
+# the number of unlocked rooms
+SAVE_HEADER = struct.Struct("<4sBQIHI")
+SAVES_HEADER = struct.Struct("<4sBI")  # magic, version, number of sessions
+
+
+###########################################################################################
+# the state of one player
+class Session:
+    # the constructor
+    def __init__(self, room):
+        # a session has the room the player is currently in, the player's inventory and the
+        # ids of the locked rooms the player has unlocked (the inventory and unlocked rooms are
+        # ordered sets: dicts of names, in the order they were added)
+        self.currentRoom = room
+        self.inventory = {}
+        self.unlocked = {}
+
+
+# returns the status shown to the player after a command: the response, their room and
+# what they are carrying
+# the status is the response to the command
+def formatStatus(status, session):
+    parts = statusParts(status, session)
+    if (parts == None):
+        return endingStatus(session)
+    return "".join(parts)
+
+
+# returns the status split into the parts a front end can redraw on their own: the
+# response, the room and the inventory (or None if the game has ended)
+# the cache (optional) is a dict that keeps the text of every room it has formatted
+def statusParts(status, session, cache=None):
+    room = session.currentRoom
+    if (room == None or room == "red_door"):
+        return None
+    if (cache == None):
+        text = str(room)
+    else:
+        text = cache.get(room)
+        if (text == None):
+            text = str(room)
+            cache[room] = text
+    return ("{}\n\n".format(status), "{}\n".format(text), "You are carrying: {}\n\n".format(list(session.inventory)))
+
+
+# returns the status shown once the game has ended
+def endingStatus(session):
+    if (session.currentRoom == None):
+        # if dead, let the player know
+        return "Nice! You saved your friend and returned home!\n"
+    # dead
+    return "Oh no! You walked through the red_door and are now \n trapped here forever!"
+
+
+###########################################################################################
+# the outcome of a single command
+# the GUI (or any other front end) only has to render this
+class CommandResult:
+    # the constructor
+    def __init__(self, response, room):
+        # the text to show the player
+        self.response = response
+        # the room the player is in after the command, whether the command moved them and
+        # the room they were in before
+        self.room = room
+        self.roomChanged = False
+        self.previous = room
+        # the items that were added to and removed from the inventory
+        self.added = []
+        self.removed = []
+        # the sounds to play (in order) and the image to show
+        self.sounds = []
+        self.image = room.image if (room != None) else None
+        # whether the player wants to leave and whether the command was ignored
+        self.quit = False
+        self.ignored = False
+        # the session a load restored (None unless the command loaded a game)
+        self.restored = None
+
+
+###########################################################################################
+# the blueprint for the words that can be tab completed
+# the words are kept sorted, so all of the words starting with a prefix sit next to each
+# other and are found with a binary search; the words are added and removed as the player
+# moves and picks things up instead of being rebuilt on every command
+class WordIndex:
+    # the constructor
+    def __init__(self, words=()):
+        # the index has the sorted words and how many times each word was added
+        # (e.g., an item that is both carried and in the room)
+        self._words = []
+        self._counts = {}
+        for word in words:
+            self.add(word)
+
+    # adds a word
+    def add(self, word):
+        count = self._counts.get(word, 0)
+        if (count == 0):
+            insort(self._words, word)
+        self._counts[word] = count + 1
+
+    # removes a word (once for every time it was added)
+    def remove(self, word):
+        count = self._counts.get(word, 0)
+        if (count == 1):
+            del self._counts[word]
+            del self._words[bisect_left(self._words, word)]
+        elif (count > 1):
+            self._counts[word] = count - 1
+
+    # adds the exits, items and grabbables of a room
+    def addRoom(self, room):
+        for word in room.exits + room.items + room.grabbables:
+            self.add(word)
+
+    # removes the exits, items and grabbables of a room
+    def removeRoom(self, room):
+        for word in room.exits + room.items + room.grabbables:
+            self.remove(word)
+
+    # keeps the words up to date after a command
+    # the result is the CommandResult of the command
+    def update(self, result):
+        if (result.roomChanged):
+            self.removeRoom(result.previous)
+            self.addRoom(result.room)
+        for item in result.added:
+            self.add(item)
+        for item in result.removed:
+            self.remove(item)
+
+    # completes a prefix
+    # returns the longest completion shared by every word starting with the prefix (or None
+    # if no word does) and whether exactly one word matched
+    def complete(self, prefix):
+        # the matching words are the ones between the prefix and the last string starting with it
+        start = bisect_left(self._words, prefix)
+        end = bisect_left(self._words, prefix + "\U0010ffff", start)
+        if (start == end):
+            return None, False
+        if (end - start == 1):
+            return self._words[start], True
+        # the words are sorted, so whatever the first and last match share, they all share
+        return commonprefix([self._words[start], self._words[end - 1]]), False
+
+    # the number of different words
+    def __len__(self):
+        return len(self._words)
+
+    # whether the word can be completed
+    def __contains__(self, word):
+        return word in self._counts
+
+
+###########################################################################################
+# the blueprint for the game logic
+# runs commands against a session and reports what happened
+class GameEngine:
+    # the constructor
+    def __init__(self, world):
+        # the engine has the world, the room every new player starts in and the commands it
+        # understands (each verb maps to the function that handles it)
+        self.world = world
+        self.start = world.start
+        self.commands = {}
+        # the supported vocabulary verbs are handled by the methods of the same name
+        for verb in VERBS:
+            self.addCommand(verb, getattr(self, verb))
+        # saving and loading the game (e.g., save slot1)
+        self.saves = SAVES
+        self.addCommand("save", self.save)
+        self.addCommand("load", self.load)
+        # travelling straight to a room (e.g., travel main_hall) and hints on how to get there
+        # (the routes are only worked out the first time they're needed)
+        self.routes = None
+        self.addCommand("travel", self.travel)
+        self.addCommand("hint", self.hint)
+
+    # adds a command
+    # the verb is a string (e.g., go)
+    # the handler is called with the session, the noun and the CommandResult, and returns
+    # the response
+    def addCommand(self, verb, handler):
+        self.commands[verb] = handler
+
+    # removes a command (e.g., a front end that can't offer it)
+    def removeCommand(self, verb):
+        self.commands.pop(verb, None)
+
+    # the verbs the engine understands
+    @property
+    def verbs(self):
+        return list(self.commands)
+
+    # creates a new player that starts in the first room with an empty inventory
+    def newSession(self):
+        return Session(self.start)
+
+    # creates the tab completion words for the session (the verbs, the quit commands, the
+    # player's inventory and everything in their current room)
+    def newWords(self, session):
+        words = WordIndex(self.verbs + QUIT_COMMANDS + list(session.inventory))
+        if (session.currentRoom != None):
+            words.addRoom(session.currentRoom)
+        return words
+
+    # reads the world source (JSON) again and updates the world to match while it's being
+    # played (see World.update); anything worked out from the old rooms (the routes) is
+    # thrown away
+    # returns the ids of the rooms that changed
+    def reload(self, path):
+        changed = reloadWorld(self.world, path)
+        if (len(changed)):
+            self.start = self.world.start
+            self.routes = None
+        return changed
+
+    # keeps the player of the session in the world after a reload: they stay in their room
+    # with their inventory, except for what the world doesn't have anymore (if their room is
+    # gone they go back to the start, items that can't be carried anymore are dropped and
+    # unlocked rooms that are gone are forgotten, so the session can still be saved)
+    # returns what the player lost as a status, or None if nothing changed for them
+    def keepSession(self, session):
+        world = self.world
+        ids = set(world.ids)
+        notes = []
+        room = session.currentRoom
+        if (room != None and room != "red_door" and room.id not in ids):
+            session.currentRoom = self.start
+            notes.append("Your room was removed from the world, so you're back at the start.")
+        dropped = [item for item in session.inventory if (item not in world.itemNumbers)]
+        for item in dropped:
+            del session.inventory[item]
+        if (len(dropped)):
+            notes.append("You lost the {}, which isn't in the world anymore.".format(", ".join(dropped)))
+        forgotten = [id for id in session.unlocked if (id not in ids)]
+        for id in forgotten:
+            del session.unlocked[id]
+        if (len(forgotten)):
+            notes.append("You had unlocked {}, which isn't in the world anymore.".format(", ".join(forgotten)))
+        return "\n".join(notes) if (len(notes)) else None
+
+    # runs a single command for the given session
+    # the command is a string (e.g., go north)
+    # returns a CommandResult describing what happened
+    def runCommand(self, session, action):
+        # set the user's input to lowercase to make it easier to compare the verb and noun to known values
+        action = action.lower().strip()
+        result = CommandResult("", session.currentRoom)
+
+        # let the front end know if the player wants to leave (supports quit, exit, and bye)
+        if (action in QUIT_COMMANDS):
+            result.quit = True
+            return result
+
+        # if the current room is None, then the player is dead
+        if (session.currentRoom == None) or (session.currentRoom.name == "red_door"):
+            result.ignored = True
+            return result
+
+        # set a default response
+        response = "I don't understand. Try verb noun. Valid verbs\nare {}.".format(", ".join(self.commands))
+        # split the user input into words (words are separated by spaces) and store the words in a list
+        words = action.split()
+
+        # the game only understands two word inputs
+        if (len(words) == 2):
+            # isolate the verb and noun, and find the command for the verb
+            verb, noun = words
+            handler = self.commands.get(verb)
+            if (handler != None):
+                response = handler(session, noun, result)
+
+        # report the response and where the player ended up
+        result.response = response
+        result.roomChanged = (session.currentRoom != result.room)
+        result.room = session.currentRoom
+        result.image = session.currentRoom.image
+        return result
+
+    # applies the trigger (if any) for the verb and noun in the player's room
+    # returns the trigger's response, or the given response if the trigger doesn't have one
+    def fire(self, session, verb, noun, result, response):
+        trigger = self.world.trigger(session.currentRoom, verb, noun)
+        if (trigger == None):
+            return response
+
+        # the trigger may need the player to carry something
+        if (trigger.requires != None and trigger.requires not in session.inventory):
+            return trigger.missing if (trigger.missing != None) else response
+
+        if (trigger.sound != None):
+            result.sounds.append(trigger.sound)
+        # swap items (e.g., the polaroid_picture for a note)
+        for item in trigger.gives:
+            session.inventory[item] = True
+            result.added.append(item)
+        for item in trigger.takes:
+            if (item in session.inventory):
+                del session.inventory[item]
+                result.removed.append(item)
+        return trigger.response if (trigger.response != None) else response
+
+    # the verb is: go
+    def go(self, session, noun, result):
+        # plays sound when player moves
+        result.sounds.append("click.mp3")
+
+        # check if the noun is a valid exit
+        room = session.currentRoom.exitTo(noun)
+        if (room == None):
+            return "You can't go in that direction."
+
+        #Puts locks on certain doors throughout the map#
+        if room.is_locked and room.key_required:
+            # Check if the player has the required key (or has unlocked the room before)
+            if room.key_required not in session.inventory and room.id not in session.unlocked:
+                # when room is locked play an erorr sound
+                result.sounds.append("error.mp3")
+                # response to player if they don't have the key
+                return "You can't enter this area yet.\nYou need {} to progress.".format(room.key_required)
+
+            # response to player if the player has the key
+            # (the room stays unlocked for this player only; the world itself isn't changed)
+            session.unlocked[room.id] = True
+            session.currentRoom = room
+            return "Nice! You've unlocked this area."
+
+        # Continue if the room is not locked
+        session.currentRoom = room
+        return "You continue through the walkway."
+
+    # the verb is: look
+    def look(self, session, noun, result):
+        # check if the noun is a valid item
+        desc = session.currentRoom.describe(noun)
+        if (desc == None):
+            return "You don't see that item."
+
+        # the response is the item's description (plus any sound the item makes)
+        return self.fire(session, "look", noun, result, desc)
+
+    # the verb is: take
+    def take(self, session, noun, result):
+        # plays sound if player adds something to their inventory
+        result.sounds.append("item.mp3")
+
+        # check if the noun is a valid grabbable and is also not already in inventory
+        if (not session.currentRoom.canTake(noun) or noun in session.inventory):
+            return "You don't see that item."
+
+        # add the grabbable item to the player's inventory
+        session.inventory[noun] = True
+        result.added.append(noun)
+        return "You take {}.".format(noun)
+
+    # the verb is: give
+    def give(self, session, noun, result):
+        # whoever is in the room decides what happens (e.g., the mage gives the player a note
+        # for the polaroid_picture that reveals the name of "butterfly girl")
+        return self.fire(session, "give", noun, result, "There's no one here who wants that.")
+
+    # returns the route finder for the world (creating it the first time)
+    def routeFinder(self):
+        if (self.routes == None):
+            self.routes = RouteFinder(self.world)
+        return self.routes
+
+    # the verb is: travel
+    # the noun is a room's name (with underscores for spaces) or id
+    def travel(self, session, noun, result):
+        routes = self.routeFinder()
+        target = routes.find(noun)
+        if (target == None):
+            return "There's no such place."
+
+        # only rooms the player can get into with what they have now can be travelled to
+        exits = routes.route(session, target)
+        if (exits == None):
+            return "You can't get there yet. Try hint {}.".format(noun)
+        if (len(exits) == 0):
+            return "You're already there."
+
+        # walk the route one room at a time (so locked rooms are unlocked along the way)
+        for exit in exits:
+            self.go(session, exit, result)
+        # one click is enough for the whole trip
+        result.sounds = ["click.mp3"]
+        return "You travel {}.\nYou arrive at {}.".format(", ".join(exits), session.currentRoom.name.strip())
+
+    # the verb is: hint
+    # the noun is a room's name (with underscores for spaces) or id
+    def hint(self, session, noun, result):
+        routes = self.routeFinder()
+        target = routes.find(noun)
+        if (target == None):
+            return "There's no such place."
+
+        plan = routes.plan(session, target)
+        if (plan == None):
+            return "There's no way to get there."
+        exits, keys = plan
+        if (len(exits) == 0):
+            return "You're already there."
+        # the first key the player still needs is the most useful hint
+        if (len(keys)):
+            key, room = keys[0]
+            return "You'll need {} first. Look in {}.".format(key, self.world.room(room).name.strip())
+        return "Head {}.".format(exits[0])
+
+    # returns the path of the saved game for the slot (or None if the slot name isn't allowed)
+    def savePath(self, slot):
+        if (not slot.replace("_", "").isalnum()):
+            return None
+        return os.path.join(self.saves, slot + SAVE_EXTENSION)
+
+    # the verb is: save
+    # the noun is the name of the slot to save in
+    def save(self, session, noun, result):
+        path = self.savePath(noun)
+        if (path == None):
+            return "Save slots can only use letters, numbers and _."
+        try:
+            os.makedirs(self.saves, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(self.snapshot(session))
+            os.replace(path + ".tmp", path)
+        except OSError:
+            # e.g., the game is installed somewhere read only
+            return "Couldn't save to {}.".format(noun)
+        return "Game saved to {}.".format(noun)
+
+    # the verb is: load
+    # the noun is the name of the slot to load from
+    def load(self, session, noun, result):
+        path = self.savePath(noun)
+        if (path == None or not os.path.exists(path)):
+            return "There is no saved game called {}.".format(noun)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return "Couldn't load from {}.".format(noun)
+        try:
+            saved = self.restore(data)
+        except ValueError:
+            return "{} was saved from a different world.".format(noun)
+        except (struct.error, IndexError, KeyError):
+            # e.g., an empty or cut off file
+            return "{} can't be read.".format(noun)
+
+        # report the inventory changes, then take over the saved state
+        result.added = [item for item in saved.inventory if item not in session.inventory]
+        result.removed = [item for item in session.inventory if item not in saved.inventory]
+        session.currentRoom = saved.currentRoom
+        session.inventory = saved.inventory
+        session.unlocked = saved.unlocked
+        result.restored = saved
+        return "Game loaded from {}.".format(noun)
+
+    # returns a compact snapshot (bytes) of the session
+    # the inventory is saved as a bitmask of the world's items and the unlocked rooms as
+    # their positions in the world
+    def snapshot(self, session):
+        world = self.world
+        mask = 0
+        for item in session.inventory:
+            mask |= 1 << world.itemNumbers[item]
+        inventory = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        unlocked = [world.position(id) for id in session.unlocked]
+        return b"".join([SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, world.signature,
+                                          world.position(session.currentRoom.id), len(inventory), len(unlocked)),
+                         inventory, struct.pack("<{}I".format(len(unlocked)), *unlocked)])
+
+    # returns the session saved in a snapshot
+    # the inventory comes back in the order of the world's items
+    # raises a ValueError if the snapshot isn't from this world
+    def restore(self, data):
+        world = self.world
+        magic, version, signature, room, size, count = SAVE_HEADER.unpack_from(data, 0)
+        if (magic != SAVE_MAGIC or version != SAVE_VERSION or signature != world.signature):
+            raise ValueError("the snapshot isn't from this world")
+
+        session = Session(world.room(world.ids[room]))
+        offset = SAVE_HEADER.size
+        mask = int.from_bytes(data[offset:offset + size], "little")
+        for i in range(mask.bit_length()):
+            if (mask >> i & 1):
+                session.inventory[world.items[i]] = True
+        for position in struct.unpack_from("<{}I".format(count), data, offset + size):
+            session.unlocked[world.ids[position]] = True
+        return session
+
+    # returns one snapshot (bytes) of many sessions
+    def snapshotAll(self, sessions):
+        parts = [SAVES_HEADER.pack(SAVES_MAGIC, SAVE_VERSION, len(sessions))]
+        for session in sessions:
+            data = self.snapshot(session)
+            parts.append(struct.pack("<I", len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    # returns the sessions in a snapshot made by snapshotAll
+    def restoreAll(self, data):
+        magic, version, count = SAVES_HEADER.unpack_from(data, 0)
+        if (magic != SAVES_MAGIC or version != SAVE_VERSION):
+            raise ValueError("the data isn't a batch of saved sessions")
+        sessions = []
+        offset = SAVES_HEADER.size
+        for i in range(count):
+            (size,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            sessions.append(self.restore(data[offset:offset + size]))
+            offset += size
+        return sessions
+
+    # saves many sessions to a file with a single write
+    def saveAll(self, path, sessions):
+        data = self.snapshotAll(sessions)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    # returns the sessions saved to a file by saveAll
+    def loadAll(self, path):
+        with open(path, "rb") as f:
+            return self.restoreAll(f.read())
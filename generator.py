@@ -0,0 +1,169 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: Generates big worlds (up to millions of rooms) for testing how the game
+# scales. The worlds are written in the world.json format one room at a time (so even a
+# huge one never has to fit in memory), are the same every time for the same seed, and can
+# always be won.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+
+###########################################################################################
+# constants
+SEED = 0  # the seed used if none is given
+SEGMENT = 50  # the number of rooms between locked rooms
+SHORTCUTS = 0.3  # the chance of each room having an extra exit (to anywhere in the world)
+COINS = 0.1  # the chance of each room having a coin to take
+TRADES = 0.2  # the chance of someone trading a gem for the coin in a room with a coin
+# the images used for the rooms (and the ending)
+IMAGES = ["room1.png", "room2.png", "room2b.png", "room3.png", "room4.png", "room5.png", "room6.png",
+          "room7.png", "room8.png", "room9.png", "room10.png", "room10b.png", "room11.png"]
+ENDING_IMAGE = "good_ending.png"
+# the directions used for extra exits (north and south always lead along the world)
+DIRECTIONS = ["east", "west", "north_east", "north_west", "south_east", "south_west"]
+# the things rooms are furnished with
+THINGS = ["table", "chair", "candle", "mirror", "painting", "clock", "rug", "lamp", "shelf", "chest",
+          "window", "bookcase", "vase", "statue", "curtain", "bell"]
+
+
+###########################################################################################
+# the blueprint for a world generator
+# the rooms are laid out in a line (north goes to the next room, south to the previous one)
+# with extra exits that jump anywhere; every SEGMENT rooms there is a locked room whose key
+# lies somewhere in the segment before it, so walking north always finds every key before
+# its lock and reaches the good ending in the last room
+# every room (and segment) has a random generator of its own, seeded from the world's seed
+# and its number, so any room can be made on its own, in any order
+class Generator:
+    # the constructor
+    def __init__(self, rooms, seed=SEED, segment=SEGMENT, shortcuts=SHORTCUTS, coins=COINS):
+        if (rooms < 2):
+            raise ValueError("a world needs at least 2 rooms")
+        self.rooms = rooms
+        self.seed = seed
+        self.segment = segment
+        self.shortcuts = shortcuts
+        self.coins = coins
+        # the segment whose key was placed last, and the room it's in
+        self._keySegment = None
+        self._keyRoom = None
+
+    # returns the random generator of a room (or anything else with a number)
+    def random(self, kind, number):
+        return random.Random("{}:{}:{}".format(self.seed, kind, number))
+
+    # returns the room number holding the key of the segment
+    def keyRoom(self, segment):
+        # the rooms are usually made in order, so the last segment's key is kept
+        if (segment != self._keySegment):
+            self._keySegment = segment
+            self._keyRoom = segment * self.segment + self.random("key", segment).randrange(self.segment)
+        return self._keyRoom
+
+    # returns the id of the room number
+    def id(self, number):
+        return "g{}".format(number)
+
+    # returns the room (as in world.json) with the number and its triggers
+    def room(self, number):
+        rng = self.random("room", number)
+        last = self.rooms - 1
+        if (number == last):
+            return {"id": self.id(number), "name": "The way home", "image": ENDING_IMAGE, "ending": "good",
+                    "description": "You found your way home.", "exits": {}, "items": {}, "grabbables": []}, []
+
+        # north and south lead along the world (the room before the last leads home)
+        exits = {}
+        if (number > 0):
+            exits["south"] = self.id(number - 1)
+        exits["back_home" if (number + 1 == last) else "north"] = self.id(number + 1)
+        # an extra exit to anywhere (except straight to the ending)
+        if (rng.random() < self.shortcuts):
+            exits[rng.choice(DIRECTIONS)] = self.id(rng.randrange(last))
+
+        things = rng.sample(THINGS, rng.randint(1, 3))
+        items = {}
+        for thing in things:
+            items[thing] = "It's a {} from room {}.".format(thing, number)
+        grabbables = []
+        # the first room of every segment (but the first) is locked with the key of the
+        # segment before it
+        segment = number // self.segment
+        locked = (number > 0 and number % self.segment == 0)
+        if (self.keyRoom(segment) == number):
+            grabbables.append("key_{}".format(segment))
+        triggers = []
+        if (rng.random() < self.coins):
+            coin = "coin_{}".format(number)
+            grabbables.append(coin)
+            # someone in a few of those rooms trades a gem for the coin
+            if (rng.random() < TRADES):
+                triggers.append({"room": self.id(number), "verb": "give", "noun": coin, "requires": coin,
+                                 "response": "Someone takes the coin and gives you a gem.",
+                                 "gives": ["gem_{}".format(number)], "takes": [coin]})
+
+        room = {"id": self.id(number), "name": "Room {}".format(number), "image": IMAGES[number % len(IMAGES)],
+                "description": "You are in room {}. You see a {}.".format(number, ", a ".join(things)),
+                "exits": exits, "items": items, "grabbables": grabbables}
+        if (locked):
+            room["locked"] = True
+            room["key"] = "key_{}".format(segment - 1)
+        return room, triggers
+
+    # writes the world to the file, one room (and trigger) at a time
+    def write(self, f):
+        # the triggers come after the rooms in the file, so they wait in a temporary file
+        # (not in memory) until the rooms are written
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as triggers:
+            f.write('{"start": "%s",\n"rooms": [\n' % self.id(0))
+            first = True
+            for number in range(self.rooms):
+                room, roomTriggers = self.room(number)
+                if (number > 0):
+                    f.write(",\n")
+                f.write(json.dumps(room))
+                for trigger in roomTriggers:
+                    triggers.write(("" if (first) else ",\n") + json.dumps(trigger))
+                    first = False
+            f.write('\n],\n"triggers": [\n')
+            triggers.seek(0)
+            shutil.copyfileobj(triggers, f)
+            f.write("\n]}\n")
+
+
+# writes a generated world to the path
+def generateWorld(path, rooms, seed=SEED, segment=SEGMENT, shortcuts=SHORTCUTS, coins=COINS):
+    with open(path, "w", encoding="utf-8") as f:
+        Generator(rooms, seed, segment, shortcuts, coins).write(f)
+
+
+###########################################################################################
+# generate a world from the command line:
+#  python generator.py <rooms> [--seed <n>] [--segment <rooms>] [--shortcuts <chance>] [--coins <chance>]
+#                       [--output <file>]
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Generate a big Room Adventure world.")
+    parser.add_argument("rooms", type=int)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--segment", type=int, default=SEGMENT, help="the number of rooms between locked rooms")
+    parser.add_argument("--shortcuts", type=float, default=SHORTCUTS, help="the chance of a room having an extra exit")
+    parser.add_argument("--coins", type=float, default=COINS, help="the chance of a room having a coin")
+    parser.add_argument("--output", help="the world file to write (instead of printing it)")
+    args = parser.parse_args(args)
+
+    if (args.output != None):
+        generateWorld(args.output, args.rooms, args.seed, args.segment, args.shortcuts, args.coins)
+    else:
+        Generator(args.rooms, args.seed, args.segment, args.shortcuts, args.coins).write(sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
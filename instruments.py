@@ -0,0 +1,107 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: Optional timing instrumentation for the Room Adventure game. Functions are
+# only wrapped with timers when instrumentation is turned on, so it costs nothing otherwise.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import sys
+import time
+
+###########################################################################################
+# constants
+BUCKETS = 32  # histogram buckets (bucket n holds times under 2**n microseconds)
+
+
+###########################################################################################
+# the blueprint for a histogram of times
+# times are counted in power-of-two buckets of microseconds, so adding one is a few integer
+# operations and the histogram never grows
+class Histogram:
+    # the constructor
+    def __init__(self, name):
+        # the histogram has a name, a count per bucket, and the number, total and longest
+        # of the times added to it
+        self.name = name
+        self.buckets = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    # adds a time (in seconds)
+    def add(self, seconds):
+        self.buckets[min(int(seconds * 1000000).bit_length(), BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if (seconds > self.max):
+            self.max = seconds
+
+    # returns the time (in seconds) that the given fraction of the times were under
+    # (rounded up to the top of its bucket)
+    def percentile(self, fraction):
+        if (self.count == 0):
+            return 0.0
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if (seen >= fraction * self.count):
+                return min(2 ** bucket / 1000000, self.max)
+        return self.max
+
+    # returns one line summing up the histogram (times in ms)
+    def __str__(self):
+        mean = self.total / self.count if (self.count) else 0.0
+        return "{:<20} {:>7} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f}".format(
+            self.name, self.count, mean * 1000, self.percentile(0.5) * 1000, self.percentile(0.99) * 1000,
+            self.max * 1000)
+
+
+###########################################################################################
+# the blueprint for a set of instruments
+# keeps a histogram for every function it has wrapped
+class Instruments:
+    # the constructor
+    def __init__(self):
+        # the instruments have their histograms (by name, in the order they were made)
+        self.histograms = {}
+
+    # returns the histogram with the name (making it if needed)
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if (histogram == None):
+            histogram = Histogram(name)
+            self.histograms[name] = histogram
+        return histogram
+
+    # returns a function that calls fn and adds how long it took to the named histogram
+    def timed(self, name, fn):
+        histogram = self.histogram(name)
+        clock = time.perf_counter
+
+        def timer(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.add(clock() - start)
+        return timer
+
+    # replaces the attribute (a function or method) of the object with a timed version
+    # the object can be a class (to time the method for every instance)
+    def wrap(self, obj, attribute, name=None):
+        if (name == None):
+            name = attribute
+        setattr(obj, attribute, self.timed(name, getattr(obj, attribute)))
+
+    # returns a table of every histogram (times in ms)
+    def report(self):
+        lines = ["{:<20} {:>7} {:>9} {:>9} {:>9} {:>9}".format("", "count", "mean", "p50", "p99", "max")]
+        for histogram in self.histograms.values():
+            lines.append(str(histogram))
+        return "\n".join(lines)
+
+    # prints the table of every histogram (e.g., when the game exits)
+    def dump(self, file=None):
+        print(self.report(), file=file if (file != None) else sys.stderr)
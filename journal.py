@@ -0,0 +1,159 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: An append-only journal of every command the players run, and a replay that
+# rebuilds their sessions from it without the GUI (for crash recovery and bug reports).
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import os
+import sys
+import time
+from engine import GameEngine
+from world import createRooms
+
+###########################################################################################
+# constants
+SYNC_RECORDS = 64  # how many commands can be written before the journal is synced to disk
+SYNC_SECONDS = 1.0  # how long (in seconds) the journal can go without being synced
+BUFFER_SIZE = 64 * 1024  # the size (in bytes) of the journal's write buffer
+
+
+# the id of the room a command ended in (empty once the player has left the house)
+def roomId(result):
+    return result.room.id if (result.room != None) else ""
+
+
+###########################################################################################
+# the blueprint for a journal
+# each line of the journal is one command:
+#  <session id> TAB <command> TAB <room id after the command> TAB <items added> TAB <items removed>
+# and a load that worked also has the rooms the saved game had unlocked:
+#  ... TAB <items removed> TAB <unlocked room ids>
+# lines are buffered and only synced to disk every so many commands (or seconds), so the
+# game never waits on the disk for a single keystroke
+class Journal:
+    # the constructor
+    def __init__(self, path, syncRecords=SYNC_RECORDS, syncSeconds=SYNC_SECONDS):
+        # the journal has its file, when to sync it, and the commands written since the last sync
+        self.path = path
+        self.syncRecords = syncRecords
+        self.syncSeconds = syncSeconds
+        self._file = open(path, "a", encoding="utf-8", buffering=BUFFER_SIZE)
+        self._unsynced = 0
+        self._synced = time.monotonic()
+
+    # writes a command and its result to the journal
+    # the session is any id for the player (e.g., a connection number)
+    def record(self, session, action, result):
+        # quitting and ignored commands don't change anything, so there is nothing to replay
+        if (result.quit or result.ignored):
+            return
+        # tabs and line breaks would break up the line, so they become spaces
+        action = " ".join(action.split())
+        fields = [str(session), action, roomId(result), ",".join(result.added), ",".join(result.removed)]
+        # replay doesn't read the save slot again (it may have changed since), so what the
+        # load restored that isn't in the other fields is written down too
+        if (result.restored != None):
+            fields.append(",".join(result.restored.unlocked))
+        self._file.write("\t".join(fields) + "\n")
+
+        self._unsynced += 1
+        if (self._unsynced >= self.syncRecords or time.monotonic() - self._synced >= self.syncSeconds):
+            self.sync()
+
+    # writes everything buffered to the disk
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._synced = time.monotonic()
+
+    # syncs the journal if anything written has waited syncSeconds or more
+    # (called on a timer, so the last commands before a pause don't wait for the next one)
+    def syncIfDue(self):
+        if (self._unsynced > 0 and not self._file.closed and time.monotonic() - self._synced >= self.syncSeconds):
+            self.sync()
+
+    # syncs and closes the journal
+    def close(self):
+        if (not self._file.closed):
+            self.sync()
+            self._file.close()
+
+
+# returns the names in a field of the journal (e.g., the items added)
+def names(field):
+    return field.split(",") if (len(field)) else []
+
+
+# does what a load in the journal did to the session (without reading the save slot)
+# the fields are the load's line of the journal
+# returns whether the room the load went to is still in the world
+def applyLoad(world, session, fields):
+    room = fields[2]
+    try:
+        session.currentRoom = world.room(room) if (len(room)) else None
+    except KeyError:
+        return False
+    for item in names(fields[3]):
+        session.inventory[item] = True
+    for item in names(fields[4]):
+        session.inventory.pop(item, None)
+    if (len(fields) == 6):
+        # a load that worked puts the inventory in the order of the world's items (as restore
+        # does) and brings back the rooms the saved game had unlocked
+        last = len(world.items)
+        session.inventory = dict.fromkeys(sorted(session.inventory, key=lambda item: world.itemNumbers.get(item, last)), True)
+        session.unlocked = dict.fromkeys(names(fields[5]), True)
+    return True
+
+
+# rebuilds the sessions in a journal by running its commands through the engine again
+# saves and loads aren't run again, so the result doesn't depend on the save slots on disk
+# now: a save doesn't change the session, and a load is taken from the journal
+# returns the sessions (by session id) and the number of commands that didn't end up in the
+# room the journal says they did (e.g., because the world has changed since)
+def replay(path, engine, sessions=None):
+    if (sessions == None):
+        sessions = {}
+    mismatches = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            # a line that was only partly written when the game stopped is skipped
+            if (not line.endswith("\n") or len(fields) not in (5, 6)):
+                continue
+            id, action, room = fields[0], fields[1], fields[2]
+
+            session = sessions.get(id)
+            if (session == None):
+                session = engine.newSession()
+                sessions[id] = session
+            words = action.lower().split()
+            verb = words[0] if (len(words) == 2) else None
+            if (verb == "save"):
+                continue
+            if (verb == "load"):
+                if (not applyLoad(engine.world, session, fields)):
+                    mismatches += 1
+                continue
+            result = engine.runCommand(session, action)
+            if (roomId(result) != room):
+                mismatches += 1
+    return sessions, mismatches
+
+
+###########################################################################################
+# replay a journal from the command line:
+#  python journal.py <journal> [<world file>]
+if __name__ == "__main__":
+    engine = GameEngine(createRooms(*sys.argv[2:3]))
+    start = time.perf_counter()
+    sessions, mismatches = replay(sys.argv[1], engine)
+    seconds = time.perf_counter() - start
+
+    for id, session in sessions.items():
+        print("{}: {} carrying {}".format(id, session.currentRoom.name, list(session.inventory)))
+    print("replayed {} sessions in {:.3f} s ({} mismatches)".format(len(sessions), seconds, mismatches))
@@ -0,0 +1,213 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: Finds the shortest way between rooms for the travel and hint commands,
+# taking the locked rooms (and the keys the player holds) into account.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+from collections import deque
+from functools import lru_cache
+
+###########################################################################################
+# constants
+ROUTE_CACHE_SIZE = 64  # the most route tables (one per destination and set of keys) kept at once
+PLAN_LIMIT = 5000  # the most states a plan explores before settling for the nearest useful key
+
+
+###########################################################################################
+# the blueprint for a route finder
+# the rooms and their exits are read once; after that, the way to a room (from every other
+# room) is worked out once per set of keys the player could hold and kept in a table, so a
+# route is only a few dictionary lookups until the player picks up another key
+class RouteFinder:
+    # the constructor
+    def __init__(self, world, size=ROUTE_CACHE_SIZE):
+        # the route finder has the world, the ways into every room (the room and exit that
+        # lead there), the key each locked room needs, the keys lying in each room and the
+        # rooms by name (e.g., main_hall) and id (e.g., r8)
+        self.world = world
+        self._entrances = {}
+        self._locks = {}
+        self._keys = {}
+        self._names = {}
+        for room in world:
+            self._names[room.id.lower()] = room.id
+            self._names["_".join(room.name.lower().split())] = room.id
+            self._entrances.setdefault(room.id, [])
+            if (room.is_locked and room.key_required):
+                self._locks[room.id] = room.key_required
+            for exit in room.exits:
+                target = room.exitTo(exit)
+                if (target != None):
+                    self._entrances.setdefault(target.id, []).append((room.id, exit))
+        # only the keys that open something matter for routes
+        self._lockKeys = set(self._locks.values())
+        for room in world:
+            found = [item for item in room.grabbables if (item in self._lockKeys)]
+            if (len(found)):
+                self._keys[room.id] = found
+        self.table = lru_cache(size)(self._table)
+        self.plans = lru_cache(size)(self._plan)
+
+    # returns the id of the room with the name or id (or None if there's no such room)
+    def find(self, name):
+        return self._names.get(name.lower())
+
+    # returns the keys (that open something) held by the player and the rooms they have
+    # unlocked without holding the key anymore
+    # (sessions that can go through the same rooms share the same state, and so the same tables)
+    def state(self, session):
+        held = frozenset(item for item in session.inventory if (item in self._lockKeys))
+        unlocked = frozenset(id for id in session.unlocked if (id in self._locks and self._locks[id] not in held))
+        return (held, unlocked)
+
+    # returns whether a player with the keys and unlocked rooms can enter the room
+    def _open(self, id, held, unlocked):
+        key = self._locks.get(id)
+        return (key == None or key in held or id in unlocked)
+
+    # works out the way to the room from every room that can reach it with the state
+    # returns the exit to take (and the number of steps left) by room id
+    def _table(self, state, target):
+        held, unlocked = state
+        table = {target: (None, 0)}
+        queue = deque([target])
+        while (len(queue)):
+            id = queue.popleft()
+            # a room the player can't enter can't be passed through (only stood in)
+            if (not self._open(id, held, unlocked)):
+                continue
+            steps = table[id][1] + 1
+            for previous, exit in self._entrances[id]:
+                if (previous not in table):
+                    table[previous] = (exit, steps)
+                    queue.append(previous)
+        return table
+
+    # returns the exits that take the player from their room to the target with the keys
+    # they hold now (or None if they can't get there yet)
+    def route(self, session, target):
+        room = session.currentRoom
+        if (room == None):
+            return None
+        return self._follow(self.table(self.state(session), target), room, target)
+
+    # returns the exits the table takes from the room to the target (or None if the table
+    # doesn't reach the room)
+    def _follow(self, table, room, target):
+        if (room.id not in table):
+            return None
+        exits = []
+        while (room.id != target):
+            exit = table[room.id][0]
+            exits.append(exit)
+            room = room.exitTo(exit)
+        return exits
+
+    # plans the shortest way to the target, picking up keys on the way
+    # returns the exits to take and the keys picked up (with the id of the room each one is
+    # in) in order, or None if there's no way to get there at all
+    # (plans are kept per room, state and target, like the route tables)
+    def plan(self, session, target):
+        room = session.currentRoom
+        if (room == None):
+            return None
+        return self.plans(room.id, self.state(session), target)
+
+    # works out the plan from the room with the state
+    # a far away target can take more states to plan than are worth exploring (there is one
+    # per room and set of keys), so after limit states the plan only leads to the nearest key
+    # that's worth picking up (see _nearestKey)
+    def _plan(self, origin, state, target, limit=PLAN_LIMIT):
+        held, unlocked = state
+        start = (origin, held)
+        # each state is a room and the keys held there; the way there is kept as the state
+        # before it and the exit taken (or the key picked up)
+        previous = {start: None}
+        queue = deque([start])
+        while (len(queue)):
+            if (len(previous) > limit):
+                return self._nearestKey(origin, (held, unlocked), target)
+            state = queue.popleft()
+            id, keys = state
+            if (id == target):
+                return self._unwind(previous, state)
+
+            # picking up the keys in the room is a step of its own
+            for key in self._keys.get(id, []):
+                if (key not in keys):
+                    next = (id, keys | {key})
+                    if (next not in previous):
+                        previous[next] = (state, None, key)
+                        queue.append(next)
+
+            room = self.world.room(id)
+            for exit in room.exits:
+                to = room.exitTo(exit)
+                if (to == None):
+                    continue
+                next = (to.id, keys)
+                if (next not in previous and self._open(to.id, keys, unlocked)):
+                    previous[next] = (state, exit, None)
+                    queue.append(next)
+        return None
+
+    # returns the route to the target if the player can already get there, or else the way to
+    # the nearest key (in the same form as a plan) they can get to now that opens one of the
+    # locked rooms in the way of the target (or, failing that, any locked room they can't
+    # get into yet), or None if there's no such key
+    def _nearestKey(self, id, state, target):
+        held, unlocked = state
+        table = self.table(state, target)
+        exits = self._follow(table, self.world.room(id), target)
+        if (exits != None):
+            return exits, []
+        # the locked rooms in the way are the ones the target's table couldn't pass through
+        blocking = set(self._locks[door] for door in table if (not self._open(door, held, unlocked)))
+        useful = set(key for door, key in self._locks.items() if (not self._open(door, held, unlocked)))
+        # every room the player can get to now, nearest first (with the room and exit that
+        # lead there)
+        previous = {id: None}
+        queue = deque([id])
+        found = None
+        while (len(queue)):
+            room = queue.popleft()
+            for key in self._keys.get(room, []):
+                if (key in blocking):
+                    return self._walk(previous, room), [(key, room)]
+                if (found == None and key in useful):
+                    found = (room, key)
+            current = self.world.room(room)
+            for exit in current.exits:
+                to = current.exitTo(exit)
+                if (to != None and to.id not in previous and self._open(to.id, held, unlocked)):
+                    previous[to.id] = (room, exit)
+                    queue.append(to.id)
+        if (found == None):
+            return None
+        return self._walk(previous, found[0]), [(found[1], found[0])]
+
+    # returns the exits that lead to the room (from the start of a search over rooms)
+    def _walk(self, previous, room):
+        exits = []
+        while (previous[room] != None):
+            room, exit = previous[room]
+            exits.append(exit)
+        exits.reverse()
+        return exits
+
+    # follows a plan back to its start
+    def _unwind(self, previous, state):
+        exits = []
+        keys = []
+        while (previous[state] != None):
+            state, exit, key = previous[state]
+            if (exit != None):
+                exits.append(exit)
+            else:
+                keys.append((key, state[0]))
+        exits.reverse()
+        keys.reverse()
+        return exits, keys
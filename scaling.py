@@ -0,0 +1,104 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: Makes copies of the room images scaled down to the size of the GUI's image
+# panel (and converted to PNG, so Tk can show JPEG photos too). The copies are kept on disk
+# by a hash of the original, so each image is only scaled once.
+# Scaling needs Pillow; without it, the original images are simply used as they are.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import hashlib
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from assets import HERE, readAsset
+
+###########################################################################################
+# constants
+SCALED = os.path.join(HERE, "scaled")  # where the scaled copies are kept
+SCALING_VERSION = 1  # part of every hash (change it to scale every image again)
+
+
+# imports Pillow's Image module (only when scaling is needed)
+# returns None if Pillow isn't installed
+def pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+# returns the file name of the scaled copy of the image (the bytes of the original)
+def scaledName(data, width, height):
+    digest = hashlib.sha1(data)
+    digest.update("{}x{}:{}".format(width, height, SCALING_VERSION).encode("ascii"))
+    return digest.hexdigest() + ".png"
+
+
+# scales the image down to fit in width x height (keeping its shape) and saves it as a PNG
+# (runs in a worker process)
+def scaleImage(data, width, height, target):
+    Image = pillow()
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", (width, height))
+        image = image.convert("RGBA" if ("A" in image.getbands()) else "RGB")
+        image.thumbnail((width, height))
+        # a quick compression level, since the copy is read far more often than it's written
+        image.save(target + ".tmp", "PNG", compress_level=1)
+    # only put the copy in place once it's complete
+    os.replace(target + ".tmp", target)
+    return target
+
+
+# makes scaled copies of the images (by asset name) that don't have one yet, several at once
+# returns the path of the scaled copy of every image (by asset name); images that can't be
+# scaled (or every image, without Pillow) are left out, so the originals are used instead
+def scaleImages(names, width, height, folder=SCALED, workers=None):
+    if (pillow() == None):
+        return {}
+    os.makedirs(folder, exist_ok=True)
+
+    scaled = {}
+    missing = {}
+    for name in dict.fromkeys(names):
+        data = readAsset(name)
+        if (data == None):
+            continue
+        path = os.path.join(folder, scaledName(data, width, height))
+        if (os.path.exists(path)):
+            scaled[name] = path
+        else:
+            missing[name] = (data, path)
+    if (len(missing) == 0):
+        return scaled
+
+    # the scaling runs in fresh processes (not forked copies of a process running Tk)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = {}
+        for name, (data, path) in missing.items():
+            futures[name] = pool.submit(scaleImage, data, width, height, path)
+        for name, future in futures.items():
+            try:
+                scaled[name] = future.result()
+            except (OSError, ValueError, BrokenProcessPool):
+                # not an image Pillow can read (or the worker died), so the original is used
+                pass
+    return scaled
+
+
+###########################################################################################
+# scale the images from the command line (e.g., ahead of time on a kiosk):
+#  python scaling.py <width> <height> <image> ...
+if __name__ == "__main__":
+    if (pillow() == None):
+        print("scaling images needs Pillow (pip install pillow)")
+        sys.exit(1)
+    width, height = int(sys.argv[1]), int(sys.argv[2])
+    for name, path in scaleImages(sys.argv[3:], width, height).items():
+        print("{} -> {}".format(name, path))
@@ -0,0 +1,175 @@
+###########################################################################################
+# Name: Mercedes VanArsdale 
+# Description: A text (telnet-style) server for the Room Adventure game. Every connection is
+# a player with their own session, and all of the players share one world.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import argparse
+import asyncio
+import signal
+import uuid
+from engine import GameEngine, formatStatus
+from world import WORLD, createRooms
+from journal import Journal
+
+###########################################################################################
+# constants
+HOST = "0.0.0.0"  # the address the server listens on
+PORT = 4000  # the port the server listens on
+PROMPT = "> "  # shown when the server is waiting for a command
+WELCOME = "Welcome To: Don't Look Behind You!"  # the first status every player sees
+LINE_LIMIT = 1024  # the longest command (in bytes) a player can send
+BACKLOG = 4096  # how many players can be waiting to connect at once
+HANGUP_WAITS = 100  # how many times (10 ms apart) the server checks that every player is gone when stopping
+
+
+# converts text for the terminal on the other end (telnet wants \r\n line endings)
+def encode(text):
+    return text.replace("\n", "\r\n").encode("utf-8")
+
+
+###########################################################################################
+# the blueprint for the game server
+# the world is built once and never changed by the players, so any number of sessions can
+# share it; each session only holds the player's room and inventory
+class GameServer:
+    # the constructor
+    # the journal (optional) is a Journal every player's commands are written to
+    def __init__(self, engine, journal=None):
+        # the server has the engine (and through it the shared world), the session of
+        # every connected player (by connection) and the journal
+        self.engine = engine
+        self.journal = journal
+        self.sessions = {}
+        self.commands = 0
+        self.connections = 0
+        # the journal is appended to across runs, so every run's session ids start with an
+        # id of their own (e.g., 3f9c2a1e.12), and players from different runs never share one
+        # (the sessions are rebuilt from it with journal.py; the server can't hand them back
+        # after a restart, since a new connection doesn't say which player it is)
+        self.run = uuid.uuid4().hex[:8]
+        # the players would all share one folder of save slots (and reading and writing the
+        # files would hold up every other player), so saving is left to the GUI
+        engine.removeCommand("save")
+        engine.removeCommand("load")
+
+    # plays the game with one connected player
+    async def handle(self, reader, writer):
+        session = self.engine.newSession()
+        self.sessions[writer] = session
+        # every connection gets its own id in the journal
+        self.connections += 1
+        id = "{}.{}".format(self.run, self.connections)
+        try:
+            writer.write(encode(formatStatus(WELCOME, session) + PROMPT))
+            await writer.drain()
+
+            while True:
+                # wait for the player's next command (an empty read means they left)
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    writer.write(encode("That command is too long.\n"))
+                    break
+                if (not line):
+                    break
+
+                # run the command exactly like the GUI would
+                action = line.decode("utf-8", "replace")
+                result = self.engine.runCommand(session, action)
+                self.commands += 1
+                if (self.journal != None):
+                    self.journal.record(id, action, result)
+                if (result.quit):
+                    writer.write(encode("Bye!\n"))
+                    break
+                if (result.ignored):
+                    writer.write(encode(PROMPT))
+                else:
+                    writer.write(encode(formatStatus(result.response, session) + PROMPT))
+                await writer.drain()
+        except ConnectionError:
+            # the player disconnected without saying bye
+            pass
+        finally:
+            del self.sessions[writer]
+            writer.close()
+
+    # saves every connected player's session to a file in one write
+    def snapshot(self, path):
+        self.engine.saveAll(path, list(self.sessions.values()))
+
+    # syncs the journal every so often, even while nobody is typing
+    async def syncJournal(self):
+        while True:
+            await asyncio.sleep(self.journal.syncSeconds)
+            self.journal.syncIfDue()
+
+    # accepts players until the server is stopped
+    # the snapshot (if any) is the file every connected session is saved to on the way out
+    async def serve(self, host=HOST, port=PORT, snapshot=None):
+        server = await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT, backlog=BACKLOG)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print("serving the game on {}".format(addresses))
+        # stopping the server (ctrl-c or kill) runs the cleanup below instead of just ending
+        # the process
+        stop = asyncio.Event()
+        for stopSignal in [signal.SIGINT, signal.SIGTERM]:
+            try:
+                asyncio.get_running_loop().add_signal_handler(stopSignal, stop.set)
+            except NotImplementedError:
+                # e.g., on Windows (where ctrl-c still raises KeyboardInterrupt)
+                pass
+        syncing = None
+        if (self.journal != None):
+            syncing = asyncio.create_task(self.syncJournal())
+        # the sessions of the players still connected when the server stops
+        sessions = None
+        try:
+            async with server:
+                await stop.wait()
+                # hang up on the players (keeping their sessions for the snapshot), so the
+                # server can close
+                sessions = list(self.sessions.values())
+                for writer in list(self.sessions):
+                    writer.close()
+                # give their handlers a moment to see the connection close
+                for i in range(HANGUP_WAITS):
+                    if (len(self.sessions) == 0):
+                        break
+                    await asyncio.sleep(0.01)
+        finally:
+            if (syncing != None):
+                syncing.cancel()
+            if (snapshot != None):
+                self.engine.saveAll(snapshot, sessions if (sessions != None) else list(self.sessions.values()))
+            if (self.journal != None):
+                self.journal.close()
+
+
+###########################################################################################
+# start the server from the command line:
+#  python server.py [--host <host>] [--port <port>] [--world <world file>] [--snapshot <file>]
+#                   [--journal <file>]
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Serve the Room Adventure game over TCP.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--world", default=WORLD)
+    parser.add_argument("--snapshot", help="save every connected session to this file on shutdown")
+    parser.add_argument("--journal", help="write every player's commands to this file")
+    args = parser.parse_args(args)
+
+    journal = Journal(args.journal) if (args.journal != None) else None
+    server = GameServer(GameEngine(createRooms(args.world)), journal)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.snapshot))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: Plays the Room Adventure game with lots of computer players at once (spread
+# over several processes) to see how many commands the engine can handle and how much of
+# the world the players find: the rooms, the items and the endings.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from engine import GameEngine, VERBS
+from world import WORLD, createRooms
+
+###########################################################################################
+# constants
+AGENTS = 10000  # how many players to simulate
+STEPS = 500  # the most commands a player runs before giving up
+BATCH = 250  # the players simulated by a worker at once
+POLICIES = ["random", "explore"]  # how the players choose their commands
+
+
+###########################################################################################
+# the valid commands for a player
+
+# returns every command the player could sensibly run for each verb in VERBS (by verb):
+# the room's exits, the items in the room, the grabbables they don't have yet and the
+# things they are carrying
+def choices(session):
+    room = session.currentRoom
+    nouns = {"go": room.exits, "look": room.items,
+             "take": [item for item in room.grabbables if (item not in session.inventory)],
+             "give": list(session.inventory)}
+    commands = {}
+    for verb in VERBS:
+        if (len(nouns.get(verb, []))):
+            commands[verb] = ["{} {}".format(verb, noun) for noun in nouns[verb]]
+    return commands
+
+
+# picks a verb and then a command for it at random
+def randomCommand(rng, session, commands, seen):
+    return rng.choice(commands[rng.choice(list(commands))])
+
+
+# returns whether the player can get into the room (it isn't locked, or they have the key)
+def canEnter(session, room):
+    if (not room.is_locked or not room.key_required):
+        return True
+    return (room.key_required in session.inventory or room.id in session.unlocked)
+
+
+# prefers taking things and going through exits to rooms the player hasn't seen yet (and
+# can get into), and otherwise plays at random
+def exploreCommand(rng, session, commands, seen):
+    if ("take" in commands):
+        return commands["take"][0]
+    room = session.currentRoom
+    new = [exit for exit in room.exits if (room.exitTo(exit).id not in seen and canEnter(session, room.exitTo(exit)))]
+    if (len(new)):
+        return "go " + rng.choice(new)
+    return rng.choice(commands[rng.choice(list(commands))])
+
+
+###########################################################################################
+# the worker processes
+
+# the engine of the worker process
+engine = None
+
+
+# reads the world in a worker process
+def startWorker(path):
+    global engine
+    engine = GameEngine(createRooms(path))
+
+
+# plays a batch of players and returns what they did (runs in a worker process)
+# the seed makes the batch repeatable
+def play(seed, agents, steps, policy):
+    rng = random.Random(seed)
+    choose = exploreCommand if (policy == "explore") else randomCommand
+    report = {"commands": 0, "rooms": Counter(), "items": Counter(), "endings": Counter(),
+              "steps": Counter(), "unfinished": 0}
+
+    for i in range(agents):
+        session = engine.newSession()
+        seen = {session.currentRoom.id: True}
+        ending = None
+        for step in range(steps):
+            # a player that has no command left to run (e.g., stuck in a room without exits)
+            # is done
+            commands = choices(session)
+            if (len(commands) == 0):
+                break
+            engine.runCommand(session, choose(rng, session, commands, seen))
+            report["commands"] += 1
+            seen[session.currentRoom.id] = True
+            ending = session.currentRoom.ending
+            if (ending != None):
+                report["endings"][ending] += 1
+                report["steps"][ending] += step + 1
+                break
+        if (ending == None):
+            report["unfinished"] += 1
+        # count every room and item once per player
+        report["rooms"].update(seen)
+        report["items"].update(session.inventory)
+    return report
+
+
+###########################################################################################
+# runs the players over a pool of processes and adds up their reports
+# returns the combined report (with the time it took)
+def simulate(path=WORLD, agents=AGENTS, steps=STEPS, policy="random", workers=None, seed=0):
+    if (workers == None):
+        workers = os.cpu_count() or 1
+    total = {"commands": 0, "rooms": Counter(), "items": Counter(), "endings": Counter(),
+             "steps": Counter(), "unfinished": 0}
+    batches = [min(BATCH, agents - start) for start in range(0, agents, BATCH)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=startWorker, initargs=(path,)) as pool:
+        futures = [pool.submit(play, seed + i, count, steps, policy) for i, count in enumerate(batches)]
+        for future in futures:
+            report = future.result()
+            for name in ["commands", "unfinished"]:
+                total[name] += report[name]
+            for name in ["rooms", "items", "endings", "steps"]:
+                total[name].update(report[name])
+    total["seconds"] = time.perf_counter() - start
+    total["agents"] = agents
+    return total
+
+
+# returns the report as text
+def describe(report, world):
+    agents = report["agents"]
+    lines = ["{} players ran {} commands in {:.2f} s ({:.0f} commands/s)".format(
+        agents, report["commands"], report["seconds"], report["commands"] / report["seconds"])]
+
+    lines.append("rooms reached:")
+    for room in world:
+        lines.append("  {:<6} {:<28} {:6.1%}".format(room.id, room.name.strip(), report["rooms"][room.id] / agents))
+    lines.append("items carried at the end:")
+    for item in world.items:
+        lines.append("  {:<35} {:6.1%}".format(item, report["items"][item] / agents))
+    lines.append("endings:")
+    for ending, count in report["endings"].most_common():
+        lines.append("  {:<10} {:6.1%}  average {:.1f} commands".format(ending, count / agents, report["steps"][ending] / count))
+    lines.append("  {:<10} {:6.1%}".format("none", report["unfinished"] / agents))
+    return "\n".join(lines)
+
+
+###########################################################################################
+# simulate players from the command line:
+#  python simulate.py [<world file>] [--agents <n>] [--steps <n>] [--policy random|explore]
+#                     [--workers <processes>] [--seed <n>]
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Simulate players of the Room Adventure game.")
+    parser.add_argument("world", nargs="?", default=WORLD)
+    parser.add_argument("--agents", type=int, default=AGENTS)
+    parser.add_argument("--steps", type=int, default=STEPS, help="the most commands each player runs")
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--workers", type=int, help="the number of processes (every core by default)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(args)
+
+    report = simulate(args.world, args.agents, args.steps, args.policy, args.workers, args.seed)
+    print(describe(report, createRooms(args.world)))
+
+
+if __name__ == "__main__":
+    main()
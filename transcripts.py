@@ -0,0 +1,184 @@
+###########################################################################################
+# Name: Mercedes VanArsdale
+# Description: Golden transcripts of the Room Adventure game. A transcript is the commands
+# a player typed and the status the game showed after each one (as setStatus shows it);
+# recorded transcripts are played again without the GUI, many at once over a pool of
+# processes, to check that the game still answers exactly the same way.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from engine import GameEngine, formatStatus
+from server import WELCOME
+from world import WORLD, createRooms
+
+###########################################################################################
+# constants
+HERE = os.path.dirname(os.path.abspath(__file__))
+TRANSCRIPTS = os.path.join(HERE, "transcripts")  # where transcripts are kept by default
+TRANSCRIPT_EXTENSION = ".transcript"  # the extension of transcript files
+COMMAND = "> "  # the start of a line with a command
+STATUS = "|"  # the start of a line of the status shown after it
+
+
+###########################################################################################
+# playing transcripts
+
+# plays the commands in a new session and returns the transcript (as a list of lines):
+#  | <the welcome status>
+#  > <command>
+#  | <the status shown after the command>
+#  ...
+# quitting and ignored commands (e.g., after the ending) don't change the status, so
+# nothing is shown after them
+def transcript(engine, commands):
+    session = engine.newSession()
+    lines = statusLines(formatStatus(WELCOME, session))
+    for command in commands:
+        lines.append(COMMAND + command)
+        result = engine.runCommand(session, command)
+        if (not result.quit and not result.ignored):
+            lines += statusLines(formatStatus(result.response, session))
+    return lines
+
+
+# returns the lines of a status as transcript lines
+def statusLines(status):
+    return [STATUS + line for line in status.split("\n")]
+
+
+# returns the commands in a transcript (a list of lines)
+def commands(lines):
+    return [line[len(COMMAND):] for line in lines if (line.startswith(COMMAND))]
+
+
+# returns the first line where the transcripts differ as (line number, expected, actual)
+# (a line missing from either one is None), or None if they're the same
+def firstDifference(expected, actual):
+    for number in range(max(len(expected), len(actual))):
+        line = expected[number] if (number < len(expected)) else None
+        other = actual[number] if (number < len(actual)) else None
+        if (line != other):
+            return number + 1, line, other
+    return None
+
+
+# reads a transcript file (as a list of lines)
+def readTranscript(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if (text.endswith("\n")):
+        text = text[:-1]
+    return text.split("\n")
+
+
+# plays the commands and writes the transcript to the path (e.g., to record a new golden
+# transcript)
+def record(path, engine, commands):
+    lines = transcript(engine, commands)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+    return lines
+
+
+# returns every transcript file in the paths (folders are searched for transcripts)
+def findTranscripts(paths):
+    found = []
+    for path in paths:
+        if (os.path.isdir(path)):
+            found += sorted(glob.glob(os.path.join(path, "**", "*" + TRANSCRIPT_EXTENSION), recursive=True))
+        else:
+            found.append(path)
+    return found
+
+
+###########################################################################################
+# the worker processes
+
+# the engine of the worker process
+engine = None
+
+
+# reads the world in a worker process
+def startWorker(path):
+    global engine
+    engine = GameEngine(createRooms(path))
+
+
+# plays the transcript file again and returns its path with the first difference (or None)
+# (runs in a worker process)
+def check(path):
+    expected = readTranscript(path)
+    return path, firstDifference(expected, transcript(engine, commands(expected)))
+
+
+###########################################################################################
+# plays every transcript file again over a pool of processes
+# returns the first difference in each transcript (by path; None if it still matches)
+def checkAll(paths, world=WORLD, workers=None):
+    if (workers == None):
+        workers = os.cpu_count() or 1
+    if (workers <= 1 or len(paths) <= 1):
+        startWorker(world)
+        return dict(check(path) for path in paths)
+    # each worker is handed several transcripts at once, since most play in well under a
+    # millisecond
+    chunk = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=startWorker, initargs=(world,)) as pool:
+        return dict(pool.map(check, paths, chunksize=chunk))
+
+
+###########################################################################################
+# record or check transcripts from the command line:
+#  python transcripts.py record <file> [<command> ...] [--world <file>]
+#   (the commands are read from the input, one per line, if none are given)
+#  python transcripts.py check [<file or folder> ...] [--world <file>] [--workers <processes>]
+#   (exits with 1 if any transcript differs)
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Record and check golden transcripts of the Room Adventure game.")
+    # both actions play in a world
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--world", default=WORLD)
+    actions = parser.add_subparsers(dest="action", required=True)
+    recorder = actions.add_parser("record", parents=[common], help="play commands and save the transcript")
+    recorder.add_argument("file")
+    recorder.add_argument("commands", nargs="*")
+    checker = actions.add_parser("check", parents=[common], help="play transcripts again and report the first difference in each")
+    checker.add_argument("paths", nargs="*", default=[TRANSCRIPTS])
+    checker.add_argument("--workers", type=int, help="the number of processes (every core by default)")
+    args = parser.parse_args(args)
+
+    if (args.action == "record"):
+        lines = args.commands if (len(args.commands)) else [line.rstrip("\n") for line in sys.stdin]
+        record(args.file, GameEngine(createRooms(args.world)), [line for line in lines if (line.strip())])
+        print("recorded {}".format(args.file))
+        return
+
+    for path in args.paths:
+        if (not os.path.exists(path)):
+            parser.error("there's no transcript or folder called {}".format(path))
+    paths = findTranscripts(args.paths)
+    start = time.perf_counter()
+    results = checkAll(paths, args.world, args.workers)
+    seconds = time.perf_counter() - start
+
+    failed = 0
+    for path, difference in results.items():
+        if (difference != None):
+            failed += 1
+            number, expected, actual = difference
+            print("{}:{}: expected {!r}, got {!r}".format(path, number, expected, actual))
+    print("{} transcripts checked in {:.2f} s ({} differ)".format(len(paths), seconds, failed))
+    if (failed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
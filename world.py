@@ -0,0 +1,625 @@
+###########################################################################################
+# Name: Mercedes VanArsdale 
+# Description: The rooms of the Room Adventure game and the world they make up. Worlds are
+# written as JSON and compiled into an indexed binary file that is read one room at a time.
+###################################################################################
+
+
+###########################################################################################
+# import libraries
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+from functools import lru_cache
+
+###########################################################################################
+# constants
+WORLD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "world.json")  # the game's world
+COMPILED_EXTENSION = ".wld"  # the extension of compiled worlds
+MAGIC = b"ARWD"  # the first bytes of a compiled world
+VERSION = 6  # the version of the compiled world format
+HEADER = struct.Struct("<4sHIQQ")  # magic, version, number of rooms, offset of the index, offset of the text
+TEXT_CACHE_SIZE = 64  # the most decoded descriptions kept in memory per world
+
+
+###########################################################################################
+# the blueprint for a room
+class Room:
+    # rooms only have the attributes below (no per-room __dict__)
+    __slots__ = ("id", "_name", "_image", "_description", "_exits", "_items", "_grabbables", "_world",
+                 "is_locked", "key_required", "ending")
+
+    # the constructor
+    def __init__(self, name, image, id=None, world=None):
+        # rooms have an id (e.g., r1) that identifies them in the world file, a name, image,
+        # description, exits (e.g., south) mapped to their exit locations (e.g., to the south
+        # is room n), items (e.g., table) mapped to their item descriptions, and grabbables
+        # (things that can be taken into inventory, kept as an ordered set)
+        # the world (if any) loads exit locations that are only known by their id
+        self.id = id
+        self._name = name
+        self._image = image
+        self._description = ""
+        self._exits = {}
+        self._items = {}
+        self._grabbables = {}
+        self._world = world
+        self.is_locked = False
+        self.key_required = None
+        # the ending (e.g., good or bad) the room is, if the game is over once the player gets there
+        self.ending = None
+
+    # getters and setters for the instance variables
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+
+    @property
+    def image(self):
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        self._image = value
+
+    @property
+    def description(self):
+        return loadText(self._description)
+
+    @description.setter
+    def description(self, value):
+        self._description = value
+
+    # the exits, items and grabbables are still available as lists (in the order they were added)
+    @property
+    def exits(self):
+        return list(self._exits)
+
+    @exits.setter
+    def exits(self, value):
+        self._exits = dict(zip(value, self.exitLocations))
+
+    @property
+    def exitLocations(self):
+        return [self.exitTo(exit) for exit in self._exits]
+
+    @exitLocations.setter
+    def exitLocations(self, value):
+        self._exits = dict(zip(self._exits, value))
+
+    @property
+    def items(self):
+        return list(self._items)
+
+    @items.setter
+    def items(self, value):
+        self._items = dict(zip(value, self._items.values()))
+
+    @property
+    def itemDescriptions(self):
+        return [loadText(desc) for desc in self._items.values()]
+
+    @itemDescriptions.setter
+    def itemDescriptions(self, value):
+        self._items = dict(zip(self._items, value))
+
+    @property
+    def grabbables(self):
+        return list(self._grabbables)
+
+    @grabbables.setter
+    def grabbables(self, value):
+        self._grabbables = dict.fromkeys(value)
+
+    # adds an exit to the room
+    # the exit is a string (e.g., north)
+    # the room is an instance of a room (or the id of a room in the room's world)
+    def addExit(self, exit, room):
+        self._exits[exit] = room
+
+    # adds an item to the room
+    # the item is a string (e.g., table)
+    # the desc is a string that describes the item (e.g., it is made of wood)
+    def addItem(self, item, desc):
+        self._items[item] = desc
+
+    # adds a grabbable item to the room
+    # the item is a string (e.g., key)
+    def addGrabbable(self, item):
+        self._grabbables[item] = None
+
+    # removes every exit, item and grabbable from the room (e.g., before filling it in again)
+    def clear(self):
+        self._exits = {}
+        self._items = {}
+        self._grabbables = {}
+
+    # returns everything about the room as a tuple (with the exit locations by id and the
+    # descriptions decoded), e.g., to tell whether two versions of a room are the same
+    def record(self):
+        exits = tuple((exit, room.id if (isinstance(room, Room)) else room) for exit, room in self._exits.items())
+        items = tuple((item, loadText(desc)) for item, desc in self._items.items())
+        return (self._name, self._image, self.description, self.is_locked, self.key_required, self.ending,
+                exits, items, tuple(self._grabbables))
+
+    # returns the room behind the exit (or None if there is no such exit)
+    def exitTo(self, exit):
+        room = self._exits.get(exit)
+        if (room != None and not isinstance(room, Room)):
+            # the exit location is only known by its id, so load it from the world
+            room = self._world.room(room)
+            self._exits[exit] = room
+        return room
+
+    # returns the description of the item (or None if the item isn't in the room)
+    def describe(self, item):
+        desc = self._items.get(item)
+        if (desc != None):
+            desc = loadText(desc)
+        return desc
+
+    # returns whether the item can be taken from the room
+    def canTake(self, item):
+        return item in self._grabbables
+
+    ####ADD ONS#####
+    def enter(self):
+        if self.is_locked:
+            print("You can't enter this area yet.")
+        else:
+            print("You enter {}. {}".format(self.name, self.description))
+
+    def unlock(self):
+        print("Nice job! You made it through.")
+        self.is_locked = False
+
+    # returns a string description of the room as follows:
+    #  <name>
+    #  <description>
+    #  <items>
+    #  <exits>
+    # e.g.:
+    #  Room 1
+    #  You look around the room.
+    #  You see: chair table 
+    #  Exits: east south 
+    def __str__(self):
+        # the lines are joined once at the end (instead of growing the string piece by piece)
+        return "\n".join([
+            # first, the room name and description
+            self._name,
+            self.description,
+            # next, the items in the room
+            "You see: " + "".join(item + " " for item in self._items),
+            # next, the exits from the room
+            "Exits: " + "".join(exit + " " for exit in self._exits)])
+
+
+###########################################################################################
+# the blueprint for the packed text of a compiled world
+# every description is stored as UTF-8, one after another, in a memory-mapped file and is
+# only decoded when someone reads it (the most recently read ones are kept decoded)
+class TextStore:
+    # the constructor
+    # the data is the memory-mapped file and start is where the text begins in it
+    def __init__(self, data, start, size=TEXT_CACHE_SIZE):
+        self._data = data
+        self._start = start
+        self.get = lru_cache(maxsize=size)(self._decode)
+
+    # decodes the text at the offset (from the start of the text)
+    def _decode(self, offset, length):
+        offset += self._start
+        return str(self._data[offset:offset + length], "utf-8")
+
+
+# the blueprint for a description that stays in the packed text until it's read
+class LazyText:
+    __slots__ = ("store", "offset", "length")
+
+    # the constructor
+    def __init__(self, store, offset, length):
+        self.store = store
+        self.offset = offset
+        self.length = length
+
+    # decodes the text
+    def load(self):
+        return self.store.get(self.offset, self.length)
+
+
+# returns the text of a description (which is either a string or a LazyText)
+def loadText(value):
+    if (isinstance(value, LazyText)):
+        return value.load()
+    return value
+
+
+###########################################################################################
+# the blueprint for a trigger
+# a trigger is something special that happens when the player uses a verb on a noun in a
+# room (e.g., looking at the cat makes it meow, giving the mage the polaroid_picture gets
+# the player a note); a trigger without a noun applies to every other noun
+class Trigger:
+    __slots__ = ("room", "verb", "noun", "response", "sound", "requires", "missing", "gives", "takes")
+
+    # the constructor
+    # the room is the id of the room the trigger is in
+    def __init__(self, room, verb, noun=None, response=None, sound=None, requires=None, missing=None,
+                 gives=(), takes=()):
+        # what the player must do for the trigger to fire
+        self.room = room
+        self.verb = verb
+        self.noun = noun
+        # the response (None keeps the usual one) and sound of the trigger
+        self.response = response
+        self.sound = sound
+        # the item the player must carry (and the response if they don't)
+        self.requires = requires
+        self.missing = missing
+        # the items the player gets and loses
+        self.gives = list(gives)
+        self.takes = list(takes)
+
+
+###########################################################################################
+# the blueprint for a world
+# a world has all of its rooms (by id), the id of the room players start in, the triggers
+# (by room id, verb and noun) and every item a player can carry
+class World:
+    # the constructor
+    def __init__(self, rooms, start, triggers=(), items=()):
+        self._rooms = {}
+        for room in rooms:
+            self._rooms[room.id] = room
+        self._start = start
+        self._ids = list(self._rooms)
+        self._positions = None
+        self._images = None
+        self._signature = None
+        self._addTriggers(triggers)
+        self._addItems(items)
+
+    # indexes the triggers by where and how they fire
+    def _addTriggers(self, triggers):
+        self.triggers = {}
+        for trigger in triggers:
+            self.triggers[(trigger.room, trigger.verb, trigger.noun)] = trigger
+
+    # numbers the items a player can carry (e.g., for saving inventories as bitmasks)
+    def _addItems(self, items):
+        self.items = list(items)
+        self.itemNumbers = {}
+        for item in self.items:
+            self.itemNumbers[item] = len(self.itemNumbers)
+
+    # the room players start in
+    @property
+    def start(self):
+        return self.room(self._start)
+
+    # the ids of all of the rooms in the world
+    @property
+    def ids(self):
+        return self._ids
+
+    # the image of every room (each image once, in the order of the rooms)
+    @property
+    def images(self):
+        if (self._images == None):
+            self._images = list(dict.fromkeys(room.image for room in self))
+        return self._images
+
+    # returns the room with the id
+    def room(self, id):
+        return self._rooms[id]
+
+    # returns the position of the room with the id in the world (e.g., for saving)
+    def position(self, id):
+        if (self._positions == None):
+            self._positions = {}
+            for id2 in self._ids:
+                self._positions[id2] = len(self._positions)
+        return self._positions[id]
+
+    # a number that identifies the rooms and carryable items of the world (and their order),
+    # so saves, which keep them by position, can tell whether they're from this world
+    @property
+    def signature(self):
+        if (self._signature == None):
+            digest = hashlib.sha1("\n".join(self._ids).encode("utf-8"))
+            digest.update(b"\0")
+            digest.update("\n".join(self.items).encode("utf-8"))
+            self._signature = int.from_bytes(digest.digest()[:8], "little")
+        return self._signature
+
+    # returns the trigger for the verb and noun in the room (or None if there isn't one)
+    def trigger(self, room, verb, noun):
+        trigger = self.triggers.get((room.id, verb, noun))
+        if (trigger == None):
+            trigger = self.triggers.get((room.id, verb, None))
+        return trigger
+
+    # goes through every room in the world
+    def __iter__(self):
+        for id in self._ids:
+            yield self.room(id)
+
+    # the number of rooms in the world
+    def __len__(self):
+        return len(self._ids)
+
+    # drops the room with the id from the world
+    def _remove(self, id):
+        self._rooms.pop(id, None)
+
+    # updates the world to match its source (as in world.json) while it's being played
+    # rooms that are still in the source are kept (so players stay where they are, and exits
+    # to them from other rooms still lead there), and only the ones that changed are filled
+    # in again; new rooms are added and rooms that are gone are dropped
+    # the whole source is checked first and nothing changes unless all of it is valid
+    # returns the ids of the rooms that changed, were added or were dropped
+    # raises a ValueError if the source isn't a valid world (e.g., an exit to no room)
+    def update(self, source):
+        # first, build every room that changed (on its own) and check everything
+        staged = {}
+        ids = []
+        try:
+            for data in source["rooms"]:
+                id = data["id"]
+                ids.append(id)
+                room = Room(data["name"], data["image"], id, self)
+                fillRoom(room, data)
+                try:
+                    current = self.room(id)
+                except KeyError:
+                    current = None
+                if (current != None and current.record() == room.record()):
+                    continue
+                staged[id] = (room, data, current)
+            kept = set(ids)
+            # (the exits of every room, since a room that's unchanged can lead to one that's gone)
+            for data in source["rooms"]:
+                for exit, target in data.get("exits", {}).items():
+                    if (target not in kept):
+                        raise ValueError("the {} exit of {} leads to {}, which isn't a room".format(exit, data["id"], target))
+            if (source["start"] not in kept):
+                raise ValueError("the start room {} isn't a room".format(source["start"]))
+            triggers = [Trigger(**data) for data in source.get("triggers", [])]
+            items = carryable(source)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError("the world isn't complete: {!r}".format(e))
+
+        # then change the world
+        changed = list(staged)
+        for id, (room, data, current) in staged.items():
+            if (current == None):
+                self._rooms[id] = room
+            else:
+                # the room is filled in again in place, so whoever is in it stays there
+                current.clear()
+                # the exits are only known by their id, so they are looked up in this world
+                # (and reach the updated rooms) the next time someone goes through them
+                current._world = self
+                fillRoom(current, data)
+        for id in self._ids:
+            if (id not in kept):
+                self._remove(id)
+                changed.append(id)
+        self._ids = ids
+        self._positions = None
+        self._images = None
+        self._signature = None
+        self._start = source["start"]
+        self._addTriggers(triggers)
+        self._addItems(items)
+        return changed
+
+    # releases anything the world keeps open (nothing, for a world built in memory)
+    def close(self):
+        pass
+
+
+###########################################################################################
+# the blueprint for a compiled world
+# the file is memory-mapped and each room is only built the first time it's asked for
+# (rooms that are never visited are never loaded)
+class CompiledWorld(World):
+    # the constructor
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, indexOffset, textOffset = HEADER.unpack_from(self._data, 0)
+        if (magic != MAGIC or version != VERSION):
+            raise ValueError("{} is not a compiled world (version {})".format(path, VERSION))
+
+        # the index has the position of every room in the file, the id of the start room, the
+        # triggers, the items a player can carry and the images of the rooms (so they can be
+        # listed without loading every room)
+        self._index, self._start, triggers, items, self._images = marshal.loads(self._data[indexOffset:textOffset])
+        self._addTriggers([Trigger(**data) for data in triggers])
+        self._addItems(items)
+        # the descriptions stay in the file until they're read
+        self.text = TextStore(self._data, textOffset)
+        self._ids = list(self._index)
+        self._positions = None
+        self._signature = None
+        self._rooms = {}
+
+    # returns the room with the id, building it from the file if needed
+    def room(self, id):
+        room = self._rooms.get(id)
+        if (room == None):
+            offset, length = self._index[id]
+            name, image, description, exits, items, grabbables, locked, key, ending = marshal.loads(self._data[offset:offset + length])
+            room = Room(name, image, id, self)
+            room.description = LazyText(self.text, *description)
+            room.is_locked = locked
+            room.key_required = key
+            room.ending = ending
+            # the rooms behind the exits are only loaded once someone goes through them
+            for exit, target in exits:
+                room.addExit(exit, target)
+            # the item descriptions are only decoded when the player looks at the item
+            for item, desc in items:
+                room.addItem(item, LazyText(self.text, *desc))
+            for item in grabbables:
+                room.addGrabbable(item)
+            self._rooms[id] = room
+        return room
+
+    # drops the room with the id from the world (and from the index, so it isn't loaded again)
+    def _remove(self, id):
+        World._remove(self, id)
+        self._index.pop(id, None)
+
+    # closes the file
+    def close(self):
+        self._data.close()
+
+
+###########################################################################################
+# reading and writing worlds
+
+# returns every item a player can carry in the world source: the grabbables, then the
+# items triggers give out (each item once, in the order they first appear)
+def carryable(source):
+    items = {}
+    for data in source["rooms"]:
+        for item in data.get("grabbables", []):
+            items[item] = True
+    for data in source.get("triggers", []):
+        for item in data.get("gives", []):
+            items[item] = True
+    return list(items)
+
+
+# fills in the room from its source (as in world.json)
+# the exit locations are taken from rooms (by id) if it's given, otherwise they're kept as
+# ids and loaded from the room's world when someone goes through them
+def fillRoom(room, data, rooms=None):
+    room.name = data["name"]
+    room.image = data["image"]
+    room.description = data.get("description", "")
+    room.is_locked = data.get("locked", False)
+    room.key_required = data.get("key")
+    room.ending = data.get("ending")
+    for exit, target in data.get("exits", {}).items():
+        room.addExit(exit, rooms[target] if (rooms != None) else target)
+    for item, desc in data.get("items", {}).items():
+        room.addItem(item, desc)
+    for item in data.get("grabbables", []):
+        room.addGrabbable(item)
+
+
+# reads the world source (JSON) and builds every room in it
+def loadWorld(path):
+    with open(path, encoding="utf-8") as f:
+        source = json.load(f)
+
+    # first, create the room instances so that they can be referenced below
+    rooms = {}
+    for data in source["rooms"]:
+        rooms[data["id"]] = Room(data["name"], data["image"], data["id"])
+
+    # then fill them in
+    for data in source["rooms"]:
+        fillRoom(rooms[data["id"]], data, rooms)
+
+    triggers = [Trigger(**data) for data in source.get("triggers", [])]
+    return World(rooms.values(), source["start"], triggers, carryable(source))
+
+
+# compiles the world source (JSON) into the binary format read by CompiledWorld
+# the rooms are written one after another, followed by an index of where each one is and
+# then the packed text of every description (the rooms only hold its position)
+def compileWorld(source, target):
+    with open(source, encoding="utf-8") as f:
+        world = json.load(f)
+
+    index = {}
+    text = []
+    size = 0
+    with open(target + ".tmp", "wb") as f:
+        # adds a description to the packed text and returns where it is
+        def pack(value):
+            nonlocal size
+            data = value.encode("utf-8")
+            text.append(data)
+            size += len(data)
+            return (size - len(data), len(data))
+
+        # the header is written again once the position of the index is known
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        for data in world["rooms"]:
+            items = tuple((item, pack(desc)) for item, desc in data.get("items", {}).items())
+            record = marshal.dumps((data["name"], data["image"], pack(data.get("description", "")),
+                                    tuple(data.get("exits", {}).items()), items,
+                                    tuple(data.get("grabbables", [])), data.get("locked", False), data.get("key"),
+                                    data.get("ending")))
+            index[data["id"]] = (f.tell(), len(record))
+            f.write(record)
+
+        indexOffset = f.tell()
+        images = list(dict.fromkeys(data["image"] for data in world["rooms"]))
+        f.write(marshal.dumps((index, world["start"], world.get("triggers", []), carryable(world), images)))
+        textOffset = f.tell()
+        f.write(b"".join(text))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(index), indexOffset, textOffset))
+    # only replace the old compiled world once the new one is complete
+    os.replace(target + ".tmp", target)
+
+
+# opens a world
+# a JSON source is compiled next to itself the first time (and again whenever it changes)
+# and the compiled file is opened instead, so rooms are only loaded when they're needed
+def openWorld(path):
+    if (not path.endswith(".json")):
+        return CompiledWorld(path)
+
+    compiled = path[:-len(".json")] + COMPILED_EXTENSION
+    try:
+        if (not os.path.exists(compiled) or os.path.getmtime(compiled) < os.path.getmtime(path)):
+            compileWorld(path, compiled)
+        try:
+            return CompiledWorld(compiled)
+        except ValueError:
+            # compiled by an older version of the game, so compile it again
+            compileWorld(path, compiled)
+            return CompiledWorld(compiled)
+    except OSError:
+        # e.g., the folder is read only, so just read the source
+        return loadWorld(path)
+
+
+# reads the world source (JSON) again and updates the world (as it's being played) to match
+# returns the ids of the rooms that changed (see World.update)
+def reloadWorld(world, path):
+    with open(path, encoding="utf-8") as f:
+        source = json.load(f)
+    return world.update(source)
+
+
+# creates the rooms of the world
+# returns the world (the room the player starts in is world.start)
+def createRooms(path=WORLD):
+    return openWorld(path)
+
+
+###########################################################################################
+# compile a world from the command line:
+#  python world.py <world.json> [<compiled world>]
+if __name__ == "__main__":
+    source = sys.argv[1]
+    target = sys.argv[2] if (len(sys.argv) > 2) else source[:-len(".json")] + COMPILED_EXTENSION
+    compileWorld(source, target)
+    print("compiled {} into {}".format(source, target))